@@ -5,19 +5,55 @@ from __future__ import annotations
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .const import POWEROFF_GROUP_CONF, PowerOffGroup
-from .coordinator import ChernivtsiPowerOffCoordinator
+from .const import DOMAIN, POWEROFF_GROUP_CONF, SNAPSHOT_TOKEN_CONF, SNAPSHOT_URL_CONF, PowerOffGroup, entry_groups
+
+# The coordinator, hub and scraper are imported inside the entry hooks so that
+# loading the integration (e.g. for its config flow) stays cheap.
 
 PLATFORMS: list[Platform] = [Platform.CALENDAR, Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Publish the schedule snapshot for other instances."""
+    from .view import ChernivtsiPowerOffSnapshotView
+
+    hass.http.register_view(ChernivtsiPowerOffSnapshotView())
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Chernivtsi Power Offline from a config entry."""
-    coordinator = ChernivtsiPowerOffCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
+    from .aggregate import ChernivtsiPowerOffGroups
+    from .coordinator import ChernivtsiPowerOffCoordinator
+    from .hub import async_get_hub
+    from .services import async_setup_services
+
+    hub = async_get_hub(hass)
+    hub.entries.add(entry.entry_id)
+    # A snapshot source switches every entry to importing the other instance's schedules
+    hub.async_set_snapshot_source(
+        entry.entry_id, entry.data.get(SNAPSHOT_URL_CONF), entry.data.get(SNAPSHOT_TOKEN_CONF)
+    )
+    await hub.async_load()
+    async_setup_services(hass)
+    # One coordinator per group, all of them share the hub's page download
+    coordinators = [ChernivtsiPowerOffCoordinator(hass, entry, group) for group in entry_groups(entry.data)]
+    for coordinator in coordinators:
+        if coordinator.async_restore():
+            # Entities start from the cached schedule, the live scrape runs in the background
+            entry.async_create_background_task(
+                hass, coordinator.async_refresh(), f"{DOMAIN} refresh {entry.entry_id} {coordinator.group}"
+            )
+        else:
+            await coordinator.async_config_entry_first_refresh()
 
-    entry.runtime_data = coordinator
+    entry.runtime_data = ChernivtsiPowerOffGroups(coordinators)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -25,18 +61,36 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry when options are updated."""
+    """Apply the options saved by the options flow, reloading only when the entities change."""
+    from .aggregate import ChernivtsiPowerOffGroups
+
+    if not isinstance(entry.runtime_data, ChernivtsiPowerOffGroups):
+        return
+    if entry.runtime_data.groups[1:] != entry_groups(entry.data)[1:]:
+        # The set of entities changes with the extra groups
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+        return
     # Update coordinator with new group if changed - don't reload platforms
     # This preserves existing entities and just updates the data
-    if entry.runtime_data and isinstance(entry.runtime_data, ChernivtsiPowerOffCoordinator):
-        coordinator = entry.runtime_data
-        new_group = PowerOffGroup(entry.data[POWEROFF_GROUP_CONF])
-        if coordinator.group != new_group:
-            coordinator.update_group(new_group)
-            # Trigger immediate refresh to get new data
-            await coordinator.async_request_refresh()
+    coordinator = entry.runtime_data.primary
+    new_group = PowerOffGroup(entry.data[POWEROFF_GROUP_CONF])
+    if coordinator.group != new_group and not coordinator.update_group(new_group):
+        # The parsed page is too old to serve the new group, fetch it
+        await coordinator.async_request_refresh()
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    from .hub import async_get_hub
+    from .services import async_unload_services
+
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        hub = async_get_hub(hass)
+        hub.entries.discard(entry.entry_id)
+        hub.async_set_snapshot_source(entry.entry_id, None)
+        if not hub.entries:
+            hass.data.pop(DOMAIN)
+            async_unload_services(hass)
+            await hub.async_close()
+    return unload_ok
@@ -0,0 +1,112 @@
+"""Combined view of every group monitored by a config entry.
+
+An entry may watch several groups (e.g. home, office and a relative's flat).
+Each group keeps its own coordinator, all of them are served from the single
+page download of the shared hub. This module adds the cross-group answers:
+the worst current state, the earliest next power off and a merged calendar.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterable
+from datetime import datetime
+
+from homeassistant.components.calendar import CalendarEvent
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .const import STATE_OFF, STATE_ON, STATE_POSSIBLE_ON, PowerOffGroup
+from .coordinator import ChernivtsiPowerOffCoordinator
+
+# States from the least to the most severe
+STATE_SEVERITY = {STATE_ON: 0, STATE_POSSIBLE_ON: 1, STATE_OFF: 2}
+
+
+class ChernivtsiPowerOffGroups:
+    """Coordinators of the groups of a config entry, the main group first."""
+
+    def __init__(self, coordinators: list[ChernivtsiPowerOffCoordinator]) -> None:
+        """Initialize the aggregate."""
+        self.coordinators = coordinators
+        # Merged events sorted by start and the groups' event indexes they were built from
+        self._events: list[CalendarEvent] = []
+        self._event_starts: list[datetime] = []
+        self._events_from: tuple[list[CalendarEvent], ...] | None = None
+
+    @property
+    def primary(self) -> ChernivtsiPowerOffCoordinator:
+        """Get the coordinator of the main group."""
+        return self.coordinators[0]
+
+    @property
+    def groups(self) -> list[PowerOffGroup]:
+        """Get the monitored groups."""
+        return [coordinator.group for coordinator in self.coordinators]
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Listen for updates of any group, return a callback that removes the listener."""
+        removers = [coordinator.async_add_listener(update_callback) for coordinator in self.coordinators]
+
+        @callback
+        def remove_listener() -> None:
+            for remove in removers:
+                remove()
+
+        return remove_listener
+
+    @property
+    def current_state(self) -> str:
+        """Get the most severe current state across the groups."""
+        return max((c.current_state for c in self.coordinators), key=STATE_SEVERITY.__getitem__)
+
+    @property
+    def off_groups(self) -> list[PowerOffGroup]:
+        """Get the groups that are off right now."""
+        return [c.group for c in self.coordinators if c.current_state == STATE_OFF]
+
+    @property
+    def next_poweroff(self) -> datetime | None:
+        """Get the earliest next power off across the groups."""
+        return min(filter(None, (c.next_poweroff for c in self.coordinators)), default=None)
+
+    def _ensure_events(self) -> None:
+        """Merge the groups' events after a refresh or a midnight rollover of any of them."""
+        sources = tuple(c.events for c in self.coordinators)
+        if self._events_from is not None and all(a is b for a, b in zip(sources, self._events_from)):
+            return
+        self._events = merge_events(event for events in sources for event in events)
+        self._event_starts = [event.start for event in self._events]
+        self._events_from = sources
+
+    def get_event_at(self, at: datetime) -> CalendarEvent | None:
+        """Get the merged event in progress at the given time, OFF before POSSIBLE ON."""
+        self._ensure_events()
+        in_progress = [event for event in self._events[: bisect_right(self._event_starts, at)] if at < event.end]
+        return max(in_progress, key=lambda event: STATE_SEVERITY[event.summary], default=None)
+
+    def get_events_between(self, start_date: datetime, end_date: datetime) -> list[CalendarEvent]:
+        """Get the merged events of all groups overlapping the window.
+
+        Events of different states may overlap, so only the window end is bisected.
+        Windows reaching into archived days merge the groups' own events instead.
+        """
+        if any(start_date < c.schedule_start for c in self.coordinators):
+            return merge_events(
+                event for c in self.coordinators for event in c.get_events_between(start_date, end_date)
+            )
+        self._ensure_events()
+        last = bisect_left(self._event_starts, end_date)
+        return [event for event in self._events[:last] if event.end > start_date]
+
+
+def merge_events(events: Iterable[CalendarEvent]) -> list[CalendarEvent]:
+    """Merge overlapping or contiguous events of the same state, return them sorted by start."""
+    merged: dict[str, list[CalendarEvent]] = {}
+    for event in sorted(events, key=lambda event: event.start):
+        same_state = merged.setdefault(event.summary, [])
+        if same_state and event.start <= same_state[-1].end:
+            if event.end > same_state[-1].end:
+                # The groups' events are shared, the merged one is a copy
+                same_state[-1] = CalendarEvent(start=same_state[-1].start, end=event.end, summary=event.summary)
+            continue
+        same_state.append(event)
+    return sorted((event for events in merged.values() for event in events), key=lambda event: event.start)
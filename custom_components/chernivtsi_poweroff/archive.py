@@ -0,0 +1,91 @@
+"""Append-only archive of finalized group-days.
+
+Once a day has passed, its schedule can no longer change, so every group-day
+is written as one fixed-width record:
+
+    uint32 date ordinal | uint8 group | uint64 OFF mask | uint64 POSSIBLE ON mask
+
+Records are appended in date order, so the file can be bisected (or mmap-ed)
+by date without an index. The whole archive is kept in memory: a year of the
+twelve groups is under 100 KB. Reading and writing the file is blocking and
+must run in an executor; `add` and `query` only touch memory.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from datetime import date
+from pathlib import Path
+import struct
+
+from .schedule import DaySchedule
+
+RECORD = struct.Struct("<IBQQ")
+
+ArchivedDay = tuple[date, str, DaySchedule]
+
+
+class ScheduleArchive:
+    """Finalized days of every group, oldest first."""
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the archive backed by the file at path."""
+        self.path = path
+        self._data = b""
+        # Date ordinal of every record, for bisection
+        self._ordinals = array("I")
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def load(self) -> None:
+        """Read the archive file, dropping a record torn by an interrupted write."""
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            data = b""
+        data = data[: len(data) - len(data) % RECORD.size]
+        ordinals = array("I", (record[0] for record in RECORD.iter_unpack(data)))
+        self._data, self._ordinals = data, ordinals
+
+    def add(self, days: Iterable[ArchivedDay]) -> bytes:
+        """Add finalized days and return their encoded records for `write`.
+
+        Days older than the newest archived one and group-days that are
+        already archived are skipped.
+        """
+        last = self._ordinals[-1] if self._ordinals else 0
+        archived = {group for _, group, _ in self._read(bisect_left(self._ordinals, last), len(self._ordinals))}
+        records = []
+        for day, group, schedule in sorted(days, key=lambda item: (item[0], int(item[1]))):
+            ordinal = day.toordinal()
+            if ordinal < last or (ordinal == last and group in archived):
+                continue
+            if ordinal > last:
+                last, archived = ordinal, set()
+            archived.add(group)
+            records.append(RECORD.pack(ordinal, int(group), schedule.off, schedule.possible_on))
+            self._ordinals.append(ordinal)
+        encoded = b"".join(records)
+        self._data += encoded
+        return encoded
+
+    def write(self, encoded: bytes) -> None:
+        """Append records returned by `add` to the archive file."""
+        if not encoded:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("ab") as file:
+            file.write(encoded)
+
+    def query(self, start: date, end: date, group: str | None = None) -> list[ArchivedDay]:
+        """Return the archived days from start to end (inclusive), optionally of a single group."""
+        lo = bisect_left(self._ordinals, start.toordinal())
+        hi = bisect_right(self._ordinals, end.toordinal())
+        return [day for day in self._read(lo, hi) if group is None or day[1] == str(group)]
+
+    def _read(self, lo: int, hi: int) -> list[ArchivedDay]:
+        return [
+            (date.fromordinal(ordinal), str(group), DaySchedule(off, possible_on))
+            for ordinal, group, off, possible_on in RECORD.iter_unpack(self._data[lo * RECORD.size : hi * RECORD.size])
+        ]
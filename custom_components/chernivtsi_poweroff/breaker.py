@@ -0,0 +1,66 @@
+"""Circuit breaker for the shutdowns page.
+
+After `threshold` failed fetches in a row the breaker opens and further
+fetches are rejected without touching the network for `cooldown` seconds.
+The first fetch after the cooldown is a trial: success closes the breaker,
+failure opens it again for twice as long (up to `max_cooldown`).
+"""
+
+import time
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of fetching while the breaker is open."""
+
+
+class CircuitBreaker:
+    """Track consecutive fetch failures and decide whether to fetch."""
+
+    def __init__(self, threshold: int, cooldown: float, max_cooldown: float) -> None:
+        """Initialize a closed breaker."""
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.failures = 0
+        self._open_for = cooldown
+        # Monotonic time until which fetches are rejected, None while closed
+        self._retry_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        """Get the state of the breaker."""
+        if self._retry_at is None:
+            return STATE_CLOSED
+        return STATE_OPEN if time.monotonic() < self._retry_at else STATE_HALF_OPEN
+
+    @property
+    def retry_in(self) -> float:
+        """Get the seconds until the next trial fetch, 0 when fetching is allowed."""
+        return max(0.0, self._retry_at - time.monotonic()) if self._retry_at is not None else 0.0
+
+    def check(self) -> None:
+        """Raise CircuitOpenError while the breaker rejects fetches."""
+        if self.state == STATE_OPEN:
+            msg = f"Shutdowns page unavailable, next attempt in {self.retry_in:.0f} s"
+            raise CircuitOpenError(msg)
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful fetch."""
+        self.failures = 0
+        self._open_for = self.cooldown
+        self._retry_at = None
+
+    def record_failure(self) -> bool:
+        """Count a failed fetch, return True when it opened the breaker."""
+        self.failures += 1
+        if self._retry_at is not None:
+            # The trial failed, stay open for longer
+            self._open_for = min(self._open_for * 2, self.max_cooldown)
+        elif self.failures < self.threshold:
+            return False
+        self._retry_at = time.monotonic() + self._open_for
+        return True
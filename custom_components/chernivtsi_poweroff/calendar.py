@@ -11,6 +11,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
+from .aggregate import ChernivtsiPowerOffGroups
 from .coordinator import ChernivtsiPowerOffCoordinator
 
 LOGGER = logging.getLogger(__name__)
@@ -23,8 +24,14 @@ async def async_setup_entry(
 ) -> None:
     """Set up the Yasno outages calendar platform."""
     LOGGER.debug("Setup new entry: %s", config_entry)
-    coordinator: ChernivtsiPowerOffCoordinator = config_entry.runtime_data
-    async_add_entities([ChernivtsiPowerOffCalendar(coordinator)])
+    groups: ChernivtsiPowerOffGroups = config_entry.runtime_data
+    entities: list[CalendarEntity] = [
+        ChernivtsiPowerOffCalendar(coordinator, extra_group=coordinator is not groups.primary)
+        for coordinator in groups.coordinators
+    ]
+    if len(groups.coordinators) > 1:
+        entities.append(ChernivtsiPowerOffGroupsCalendar(groups))
+    async_add_entities(entities)
 
 
 class ChernivtsiPowerOffCalendar(CoordinatorEntity[ChernivtsiPowerOffCoordinator], CalendarEntity):
@@ -33,6 +40,7 @@ class ChernivtsiPowerOffCalendar(CoordinatorEntity[ChernivtsiPowerOffCoordinator
     def __init__(
         self,
         coordinator: ChernivtsiPowerOffCoordinator,
+        extra_group: bool = False,
     ) -> None:
         """Initialize the ChernivtsiPowerOffCoordinator entity."""
         super().__init__(coordinator)
@@ -40,9 +48,13 @@ class ChernivtsiPowerOffCalendar(CoordinatorEntity[ChernivtsiPowerOffCoordinator
             key="calendar",
             name="Chernivtsi PowerOff Calendar",
         )
-        self._attr_unique_id = (
-            f"{coordinator.config_entry.entry_id}-{self.entity_description.key}"
-        )
+        if extra_group:
+            self._attr_unique_id = (
+                f"{coordinator.config_entry.entry_id}-{coordinator.group}-{self.entity_description.key}"
+            )
+            self._attr_name = f"{self.entity_description.name} (group {coordinator.group})"
+        else:
+            self._attr_unique_id = f"{coordinator.config_entry.entry_id}-{self.entity_description.key}"
 
     @property
     def event(self) -> CalendarEvent | None:
@@ -60,3 +72,37 @@ class ChernivtsiPowerOffCalendar(CoordinatorEntity[ChernivtsiPowerOffCoordinator
         """Return calendar events within a datetime range."""
         LOGGER.debug('Getting all events between "%s" -> "%s"', start_date, end_date)
         return self.coordinator.get_events_between(start_date, end_date)
+
+
+class ChernivtsiPowerOffGroupsCalendar(CalendarEntity):
+    """Calendar with the merged outages of every group of an entry."""
+
+    _attr_should_poll = False
+
+    def __init__(self, groups: ChernivtsiPowerOffGroups) -> None:
+        """Initialize the merged calendar."""
+        self.groups = groups
+        self.entity_description = EntityDescription(
+            key="groups_calendar",
+            name="Chernivtsi PowerOff Calendar of all groups",
+        )
+        self._attr_unique_id = f"{groups.primary.config_entry.entry_id}-{self.entity_description.key}"
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state whenever any group is updated."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.groups.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the merged event in progress or None."""
+        return self.groups.get_event_at(dt_util.now())
+
+    async def async_get_events(
+        self,
+        hass: HomeAssistant,  # noqa: ARG002
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+    ) -> list[CalendarEvent]:
+        """Return merged calendar events within a datetime range."""
+        return self.groups.get_events_between(start_date, end_date)
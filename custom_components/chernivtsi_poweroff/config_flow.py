@@ -10,36 +10,100 @@ import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry, ConfigFlow, ConfigFlowResult, OptionsFlow
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
-
-from .const import DOMAIN, POWEROFF_GROUP_CONF, PowerOffGroup
-from .energyua_scrapper import EnergyUaScrapper
+from homeassistant.helpers.selector import SelectSelector, SelectSelectorConfig, SelectSelectorMode
+
+from .const import (
+    DOMAIN,
+    EXTRA_GROUPS_CONF,
+    PAGE_MAX_AGE_RATIO,
+    POWEROFF_GROUP_CONF,
+    SNAPSHOT_TOKEN_CONF,
+    SNAPSHOT_URL_CONF,
+    UPDATE_INTERVAL,
+    PowerOffGroup,
+    entry_groups,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+EXTRA_GROUPS_SELECTOR = SelectSelector(
+    SelectSelectorConfig(
+        options=[group.value for group in PowerOffGroup],
+        multiple=True,
+        mode=SelectSelectorMode.DROPDOWN,
+    )
+)
+
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(POWEROFF_GROUP_CONF): vol.Coerce(PowerOffGroup),
+        vol.Optional(EXTRA_GROUPS_CONF, default=[]): EXTRA_GROUPS_SELECTOR,
+        # Import the schedules published by another instance instead of scraping
+        vol.Optional(SNAPSHOT_URL_CONF): str,
+        vol.Optional(SNAPSHOT_TOKEN_CONF): str,
     }
 )
 
 
+def _options_schema(data: dict[str, Any]) -> vol.Schema:
+    """Build the options schema with the entry's current groups as defaults."""
+    return vol.Schema(
+        {
+            vol.Required(POWEROFF_GROUP_CONF, default=data[POWEROFF_GROUP_CONF]): vol.Coerce(PowerOffGroup),
+            vol.Optional(EXTRA_GROUPS_CONF, default=data.get(EXTRA_GROUPS_CONF, [])): EXTRA_GROUPS_SELECTOR,
+        }
+    )
+
+
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect.
 
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
     """
-    scrapper = EnergyUaScrapper(data[POWEROFF_GROUP_CONF])
-
-    if not await scrapper.validate():
+    # Imported here so that loading the config flow does not pull in the scraper
+    from aiohttp import ClientError
+
+    from .breaker import CircuitOpenError
+    from .hub import async_get_hub
+    from .page_parser import PageStructureError
+    from .snapshot import SnapshotError
+
+    try:
+        if snapshot_url := data.get(SNAPSHOT_URL_CONF):
+            found = await _async_snapshot_has_groups(hass, snapshot_url, data)
+        else:
+            # Answered from the shared page when it is fresh, otherwise a single download
+            # checks the main and the extra groups and is kept for the entry setup
+            hub = async_get_hub(hass)
+            found = await hub.async_has_groups(entry_groups(data), UPDATE_INTERVAL * PAGE_MAX_AGE_RATIO)
+    except (ClientError, TimeoutError, CircuitOpenError, PageStructureError, SnapshotError) as err:
+        raise CannotConnect from err
+    if not found:
         raise CannotConnect
 
     # Return info that you want to store in the config entry.
     return {
         "title": "Chernivtsi Power Offline",
         POWEROFF_GROUP_CONF: data[POWEROFF_GROUP_CONF],
+        EXTRA_GROUPS_CONF: data.get(EXTRA_GROUPS_CONF, []),
     }
 
 
+async def _async_snapshot_has_groups(hass: HomeAssistant, url: str, data: dict[str, Any]) -> bool:
+    """Download another instance's snapshot and check that it has every group.
+
+    The shared hub is left alone: it may still be scraping for other entries.
+    """
+    from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+    from .energyua_scrapper import EnergyUaScrapper
+    from .snapshot import decode_snapshot
+
+    scrapper = EnergyUaScrapper(session=async_get_clientsession(hass))
+    snapshot = decode_snapshot(await scrapper.fetch_snapshot(url, data.get(SNAPSHOT_TOKEN_CONF)) or b"")
+    return {str(group) for group in entry_groups(data)} <= snapshot.schedules.keys()
+
+
 class ChernivtsiPowerOffConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Chernivtsi Power Offline."""
 
@@ -79,9 +143,7 @@ class ChernivtsiPowerOffOptionsFlowHandler(OptionsFlow):
         """Initialize options flow."""
         self.config_entry = config_entry
 
-    async def async_step_init(
-        self, user_input: dict[str, Any] | None = None
-    ) -> ConfigFlowResult:
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
         """Manage the options."""
         if user_input is not None:
             # Validate the new group
@@ -90,64 +152,26 @@ class ChernivtsiPowerOffOptionsFlowHandler(OptionsFlow):
             except CannotConnect:
                 return self.async_show_form(
                     step_id="init",
-                    data_schema=vol.Schema(
-                        {
-                            vol.Required(
-                                POWEROFF_GROUP_CONF,
-                                default=self.config_entry.data[POWEROFF_GROUP_CONF],
-                            ): vol.Coerce(PowerOffGroup),
-                        }
-                    ),
+                    data_schema=_options_schema(dict(self.config_entry.data)),
                     errors={"base": "cannot_connect"},
                 )
             except Exception:
                 _LOGGER.exception("Unexpected exception")
                 return self.async_show_form(
                     step_id="init",
-                    data_schema=vol.Schema(
-                        {
-                            vol.Required(
-                                POWEROFF_GROUP_CONF,
-                                default=self.config_entry.data[POWEROFF_GROUP_CONF],
-                            ): vol.Coerce(PowerOffGroup),
-                        }
-                    ),
+                    data_schema=_options_schema(dict(self.config_entry.data)),
                     errors={"base": "unknown"},
                 )
 
-            # Update the config entry data
+            # The entry's update listener switches the group or reloads the entry
             self.hass.config_entries.async_update_entry(
                 self.config_entry, data={**self.config_entry.data, **user_input}
             )
-            
-            # Update coordinator with new group and trigger immediate refresh
-            if (
-                self.config_entry.runtime_data
-                and hasattr(self.config_entry.runtime_data, "update_group")
-            ):
-                from .coordinator import ChernivtsiPowerOffCoordinator
-                if isinstance(self.config_entry.runtime_data, ChernivtsiPowerOffCoordinator):
-                    coordinator = self.config_entry.runtime_data
-                    new_group = PowerOffGroup(user_input[POWEROFF_GROUP_CONF])
-                    if coordinator.group != new_group:
-                        old_group = coordinator.group
-                        coordinator.update_group(new_group)
-                        _LOGGER.info("Updating group from %s to %s, triggering immediate refresh", old_group, new_group)
-                        # Trigger immediate refresh to fetch new data for the new group
-                        self.hass.async_create_task(coordinator.async_refresh())
-            
             return self.async_create_entry(title="", data={})
 
         return self.async_show_form(
             step_id="init",
-            data_schema=vol.Schema(
-                {
-                    vol.Required(
-                        POWEROFF_GROUP_CONF,
-                        default=self.config_entry.data[POWEROFF_GROUP_CONF],
-                    ): vol.Coerce(PowerOffGroup),
-                }
-            ),
+            data_schema=_options_schema(dict(self.config_entry.data)),
         )
 
 
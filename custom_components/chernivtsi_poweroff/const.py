@@ -1,12 +1,53 @@
 """Constants for the Chernivtsi Power Offline integration."""
 
+from collections.abc import Mapping
 from enum import StrEnum
+from typing import Any
 
 DOMAIN = "chernivtsi_poweroff"
 
 POWEROFF_GROUP_CONF = "poweroff_group"
+# Further groups monitored by the same entry, on top of POWEROFF_GROUP_CONF
+EXTRA_GROUPS_CONF = "extra_groups"
+# Snapshot of another instance to import instead of scraping, and its access token
+SNAPSHOT_URL_CONF = "snapshot_url"
+SNAPSHOT_TOKEN_CONF = "snapshot_token"
+SNAPSHOT_PATH = f"/api/{DOMAIN}/snapshot"
 
+# Adaptive refresh (seconds): polls start at UPDATE_INTERVAL, back off up to
+# MAX_UPDATE_INTERVAL while the page stays the same and speed up to
+# MIN_UPDATE_INTERVAL in the evening until tomorrow's schedule is published.
 UPDATE_INTERVAL = 600
+MIN_UPDATE_INTERVAL = 180
+MAX_UPDATE_INTERVAL = 1800
+EVENING_WINDOW_START_HOUR = 17
+# Exponential backoff after failed refreshes, randomized by +/- FAILURE_JITTER
+MAX_FAILURE_BACKOFF = 3600
+FAILURE_JITTER = 0.2
+
+# Fired with the changed slots whenever a refresh edits a known schedule
+EVENT_SCHEDULE_CHANGED = f"{DOMAIN}_schedule_changed"
+
+# Maximum age (seconds) of the on-disk schedule cache restored at startup
+CACHE_MAX_AGE = 12 * 3600
+
+# A page parsed less than this share of the refresh interval ago is reused by every group
+PAGE_MAX_AGE_RATIO = 0.5
+
+# Pages of at least this many characters are parsed in a worker process instead of a
+# thread, so that an unusually large page does not hold the GIL for the whole parse
+PROCESS_POOL_MIN_PAGE_SIZE = 1_000_000
+
+# Page fetches: transient errors are retried FETCH_RETRIES times after
+# FETCH_RETRY_BACKOFF seconds (doubled per attempt, randomized by +/- FETCH_RETRY_JITTER);
+# BREAKER_THRESHOLD failed fetches in a row stop fetching for BREAKER_COOLDOWN
+# seconds, doubled after every failed trial up to MAX_BREAKER_COOLDOWN
+FETCH_RETRIES = 2
+FETCH_RETRY_BACKOFF = 2.0
+FETCH_RETRY_JITTER = 0.5
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 300
+MAX_BREAKER_COOLDOWN = 3600
 
 STATE_ON = "Power ON"
 STATE_OFF = "Power OFF"
@@ -28,3 +69,9 @@ class PowerOffGroup(StrEnum):
     Ten = "10"
     Eleven = "11"
     Twelve = "12"
+
+
+def entry_groups(data: Mapping[str, Any]) -> list[PowerOffGroup]:
+    """Return the groups of a config entry, the main group first and without duplicates."""
+    groups = [data[POWEROFF_GROUP_CONF], *data.get(EXTRA_GROUPS_CONF, ())]
+    return list(dict.fromkeys(PowerOffGroup(group) for group in groups))
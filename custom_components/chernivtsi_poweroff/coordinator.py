@@ -1,16 +1,27 @@
 """Provides the ChernivtsiPowerOffCoordinator class for polling power off periods."""
 
-from datetime import datetime, timedelta
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
 import logging
+import random
 
 from homeassistant.components.calendar import CalendarEvent
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
+    EVENING_WINDOW_START_HOUR,
+    EVENT_SCHEDULE_CHANGED,
+    FAILURE_JITTER,
+    MAX_FAILURE_BACKOFF,
+    MAX_UPDATE_INTERVAL,
+    MIN_UPDATE_INTERVAL,
+    PAGE_MAX_AGE_RATIO,
     POWEROFF_GROUP_CONF,
     UPDATE_INTERVAL,
     PowerOffGroup,
@@ -18,70 +29,388 @@ from .const import (
     STATE_OFF,
     STATE_POSSIBLE_ON,
 )
-from .energyua_scrapper import EnergyUaScrapper
-from .entities import PowerOffPeriod
+from .entities import PowerOffPeriod, local_date_start, local_day_start
+from .hub import async_get_hub
+from .schedule import SLOT_MINUTES, SLOTS_PER_DAY, DaySchedule, GroupSchedule
 
 LOGGER = logging.getLogger(__name__)
 
 TIMEFRAME_TO_CHECK = timedelta(hours=24)
+# Longest rolling window of the outage statistics (days)
+STATS_DAYS = 30
 
 
-class ChernivtsiPowerOffCoordinator(DataUpdateCoordinator):
+class ChernivtsiPowerOffCoordinator(DataUpdateCoordinator[GroupSchedule]):
     """Coordinates the polling of power off periods."""
 
     config_entry: ConfigEntry
 
-    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
-        """Initialize the coordinator."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        group: PowerOffGroup | None = None,
+    ) -> None:
+        """Initialize the coordinator for a group, the entry's main group by default."""
         super().__init__(
             hass,
             LOGGER,
             name=DOMAIN,
             update_interval=timedelta(seconds=UPDATE_INTERVAL),
+            # Listeners are only notified when the schedule actually changed
+            always_update=False,
         )
         self.hass = hass
         self.config_entry = config_entry
-        self.group: PowerOffGroup = config_entry.data[POWEROFF_GROUP_CONF]
-        self.api = EnergyUaScrapper(self.group)
-        self.periods: list[PowerOffPeriod] = []
+        self.group: PowerOffGroup = group or config_entry.data[POWEROFF_GROUP_CONF]
+        self.hub = async_get_hub(hass)
+        self.schedule = GroupSchedule()
+        # Local date of the first day of the schedule, None when the hub does not know it
+        self.schedule_date: date | None = None
         self.last_update: datetime | None = None
+        # (day, slot) pairs changed by the last refresh and the date the published data starts on
+        self.changed_slots: list[tuple[int, int]] = []
+        self._data_date: date | None = None
+        # Sorted transition index: the schedule switches to _states[i] at _transitions[i]
+        self._transitions: list[datetime] = []
+        self._states: list[str] = []
+        # Local midnight the index was built at and the start of the schedule's first day
+        self._index_day_start: datetime | None = None
+        self._schedule_start: datetime | None = None
+        # Interval index of the OFF and POSSIBLE ON events, sorted and non-overlapping
+        self._events: list[CalendarEvent] = []
+        self._event_starts: list[datetime] = []
+        self._event_ends: list[datetime] = []
+        # Outage statistics and the (day, schedule, its first day, archive size) they were computed for
+        self._past_off_slots: dict[date, int] = {}
+        self._stats: dict[str, float | None] = {}
+        self._stats_key: tuple[datetime | None, GroupSchedule, date | None, int] | None = None
+        # Timer that pushes state writes at the next schedule boundary
+        self.next_transition: datetime | None = None
+        self._unsub_transition: CALLBACK_TYPE | None = None
+        # Adaptive refresh state
+        self.next_refresh: datetime | None = None
+        self._stable_polls = 0
+        self._failures = 0
+        self._content_hash: str | None = None
+        # Written after every refresh, whether or not the schedule changed
+        self._refresh_listeners: list[CALLBACK_TYPE] = []
 
-    async def _async_update_data(self) -> dict:
+    async def _async_update_data(self) -> GroupSchedule:
         """Fetch power off periods from scrapper."""
         LOGGER.debug("Starting data update for group %s", self.group)
         try:
-            await self._fetch_periods()
+            known = self.last_update is not None
+            replaced = await self._fetch_periods()
             self.last_update = dt_util.now()
+            if replaced or self._unsub_transition is None:
+                self._async_schedule_transition()
+            self._async_adapt_interval(success=True)
+            self.hub.metrics.count("refreshes")
+            self._async_notify_refresh_listeners()
             LOGGER.debug(
-                "Successfully updated data for group %s. Found %d periods. Last update: %s",
+                "Successfully updated data for group %s. Found %d days. Last update: %s",
                 self.group,
-                len(self.periods),
+                len(self.schedule.days),
                 self.last_update,
             )
-            return {}  # noqa: TRY300
+            return self._async_diff_schedule(fire_event=known)  # noqa: TRY300
         except Exception as err:
             LOGGER.exception("Cannot obtain power offs periods for group %s", self.group)
+            self._async_adapt_interval(success=False)
+            self.hub.metrics.count("refresh_failures")
+            self._async_notify_refresh_listeners()
             msg = f"Power offs not polled: {err}"
             raise UpdateFailed(msg) from err
 
-    async def _fetch_periods(self) -> None:
-        self.periods = await self.api.get_power_off_periods()
+    async def _fetch_periods(self) -> bool:
+        """Fetch the schedule of the group and return True when it was replaced."""
+        max_age = self.update_interval.total_seconds() * PAGE_MAX_AGE_RATIO  # type: ignore[union-attr]
+        schedule = await self.hub.async_get_schedule(self.group, max_age)
+        schedule_date = self.hub.schedules_date
+        if schedule == self.schedule and schedule_date == self.schedule_date:
+            return False
+        self.schedule = schedule
+        self.schedule_date = schedule_date
+        self._index_day_start = None
+        return True
 
-    def _get_next_power_change_dt(self, on: bool) -> datetime | None:
-        """Get the next power on/off."""
+    @property
+    def first_day(self) -> date:
+        """Get the local date of the first day of the schedule, today when it is unknown."""
+        return self.schedule_date or local_day_start().date()
+
+    @property
+    def days_from_today(self) -> tuple[DaySchedule, ...]:
+        """Get the days of the schedule from today on.
+
+        After a local midnight the schedule still starts with yesterday until
+        the hub fetches again and archives it.
+        """
+        shift = (local_day_start().date() - self.first_day).days
+        return self.schedule.days[max(shift, 0) :]
+
+    @callback
+    def _async_diff_schedule(self, fire_event: bool) -> GroupSchedule:
+        """Diff the schedule against the published data and return what to publish.
+
+        The new schedule is only published, waking the listeners, when a slot
+        changed; the changed slots are then fired as EVENT_SCHEDULE_CHANGED.
+        """
+        first_day = self.first_day
+        previous = self.data
+        if previous is None or self._data_date is None:
+            self.changed_slots = []
+            self._data_date = first_day
+            return self.schedule
+        # The published data may start on an earlier day
+        shift = (first_day - self._data_date).days
+        self.changed_slots = self.schedule.changed_slots(previous, shift)
+        if not self.changed_slots:
+            return previous
+        self._data_date = first_day
+        first_day_start = local_date_start(first_day)
+        LOGGER.debug("Schedule of group %s changed in %d slots", self.group, len(self.changed_slots))
+        if fire_event:
+            self.hass.bus.async_fire(
+                EVENT_SCHEDULE_CHANGED,
+                {
+                    "entry_id": self.config_entry.entry_id,
+                    "group": str(self.group),
+                    "changes": [
+                        {
+                            "day": day,
+                            "slot": slot,
+                            "start": (first_day_start + timedelta(days=day, minutes=slot * SLOT_MINUTES)).isoformat(),
+                            "from": previous.state_at(day + shift, slot),
+                            "to": self.schedule.state_at(day, slot),
+                        }
+                        for day, slot in self.changed_slots
+                    ],
+                },
+            )
+        return self.schedule
+
+    @callback
+    def async_restore(self) -> bool:
+        """Seed the schedule from the hub's on-disk cache, return False when there is none."""
+        schedule = self.hub.get_cached_schedule(self.group)
+        if schedule is None:
+            return False
+        self.schedule = schedule
+        self.schedule_date = self.hub.schedules_date
+        self.last_update = dt_util.as_local(self.hub.fetched_at) if self.hub.fetched_at else None
+        self._content_hash = self.hub.content_hash
+        self._index_day_start = None
+        self._data_date = self.first_day
+        self._async_schedule_transition()
+        self.async_set_updated_data(schedule)
+        return True
+
+    @callback
+    def async_add_refresh_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Listen for every refresh without waking the schedule listeners.
+
+        Return a callback that removes the listener.
+        """
+        self._refresh_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._refresh_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_notify_refresh_listeners(self) -> None:
+        for update_callback in list(self._refresh_listeners):
+            update_callback()
+
+    @property
+    def data_age(self) -> timedelta | None:
+        """Get the age of the page the schedule was parsed from."""
+        if self.hub.fetched_at is None:
+            return None
+        return dt_util.utcnow() - self.hub.fetched_at
+
+    @callback
+    def _async_adapt_interval(self, success: bool) -> None:
+        """Pick the delay before the next refresh.
+
+        Failures back off exponentially with jitter. Otherwise the interval
+        doubles for every poll that returned the same page, except in the
+        evening while tomorrow's schedule is not published yet.
+        """
         now = dt_util.now()
-        events = self.get_events_between(
-            now,
-            now + TIMEFRAME_TO_CHECK,
-        )
-        if on:
-            dts = sorted(event.end for event in events)
+        if not success:
+            self._failures += 1
+            delay = min(UPDATE_INTERVAL * 2 ** (self._failures - 1), MAX_FAILURE_BACKOFF)
+            delay *= 1 + random.uniform(-FAILURE_JITTER, FAILURE_JITTER)
         else:
-            dts = sorted(event.start for event in events)
-        LOGGER.debug("Next dts: %s", dts)
-        for dt in dts:
-            if dt > now:
-                return dt  # type: ignore
+            self._failures = 0
+            if self.hub.content_hash is not None and self.hub.content_hash == self._content_hash:
+                self._stable_polls += 1
+            else:
+                self._stable_polls = 0
+            self._content_hash = self.hub.content_hash
+            if now.hour >= EVENING_WINDOW_START_HOUR and len(self.days_from_today) < 2:
+                delay = MIN_UPDATE_INTERVAL
+            else:
+                delay = min(UPDATE_INTERVAL * 2**self._stable_polls, MAX_UPDATE_INTERVAL)
+        self.update_interval = timedelta(seconds=delay)
+        self.next_refresh = now + self.update_interval
+        LOGGER.debug("Next refresh for group %s in %.0f s", self.group, delay)
+
+    @callback
+    def _async_schedule_transition(self) -> None:
+        """Arm a timer for the next state boundary (or local midnight) of the schedule."""
+        self._async_cancel_transition()
+        if self._shutdown_requested:
+            return
+        now = dt_util.now()
+        self._ensure_index()
+        midnight = self._index_day_start + timedelta(days=1)  # type: ignore[operator]
+        idx = bisect_right(self._transitions, now)
+        if idx < len(self._transitions) and self._transitions[idx] < midnight:
+            self.next_transition = self._transitions[idx]
+        else:
+            # The index is rebuilt at midnight, which may change the state as well
+            self.next_transition = midnight
+        LOGGER.debug("Next state transition for group %s at %s", self.group, self.next_transition)
+        self._unsub_transition = async_track_point_in_time(
+            self.hass, self._async_handle_transition, self.next_transition
+        )
+
+    @callback
+    def _async_handle_transition(self, _now: datetime) -> None:
+        """Push the new state to the entities without fetching anything."""
+        self._unsub_transition = None
+        # At midnight the index moves on to the next day of the schedule before the entities read it
+        self._ensure_index()
+        self.async_update_listeners()
+        self._async_schedule_transition()
+
+    @callback
+    def _async_cancel_transition(self) -> None:
+        if self._unsub_transition is not None:
+            self._unsub_transition()
+            self._unsub_transition = None
+        self.next_transition = None
+
+    async def async_shutdown(self) -> None:
+        """Cancel the transition timer along with the scheduled refresh."""
+        await super().async_shutdown()
+        self._async_cancel_transition()
+
+    @property
+    def periods(self) -> list[PowerOffPeriod]:
+        """Get the power off periods derived from the schedule."""
+        return self.schedule.periods
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the listeners, timing the entity state writes."""
+        with self.hub.metrics.timed("entity_writes"):
+            super().async_update_listeners()
+
+    def _ensure_index(self) -> None:
+        """Build the transition index after a refresh or a local midnight rollover."""
+        today_start = local_day_start()
+        if today_start is self._index_day_start:
+            return
+        with self.hub.metrics.timed("index_build"):
+            self._build_index(today_start)
+
+    def _build_index(self, today_start: datetime) -> None:
+        # The index starts on the schedule's own first day, so after midnight
+        # today is its second day rather than a replay of yesterday
+        schedule_start = local_date_start(self.first_day)
+        transitions: list[datetime] = []
+        states: list[str] = []
+        for day_idx, day in enumerate(self.schedule.days):
+            day_start = schedule_start + timedelta(days=day_idx)
+            for slot in range(SLOTS_PER_DAY):
+                state = day.state_at(slot)
+                if (states[-1] if states else STATE_ON) != state:
+                    transitions.append(day_start + timedelta(minutes=slot * SLOT_MINUTES))
+                    states.append(state)
+        if states and states[-1] != STATE_ON:
+            # Power is assumed ON after the last published day
+            transitions.append(schedule_start + timedelta(days=len(self.schedule.days)))
+            states.append(STATE_ON)
+        self._transitions = transitions
+        self._states = states
+        # Every non-ON state lasts until the next transition, the index always ends with ON
+        self._events = [
+            self._get_calendar_event(transitions[idx], transitions[idx + 1], state)
+            for idx, state in enumerate(states)
+            if state != STATE_ON
+        ]
+        self._event_starts = [event.start for event in self._events]
+        self._event_ends = [event.end for event in self._events]
+        self._index_day_start = today_start
+        self._schedule_start = schedule_start
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("Built transition index for group %s: %s", self.group, list(zip(transitions, states)))
+
+    @property
+    def outage_stats(self) -> dict[str, float | None]:
+        """Get the outage statistics in hours (the POSSIBLE ON share in percent).
+
+        They are computed from the slot counts of the day masks and only
+        recomputed after a refresh, at midnight or when a day is archived.
+        """
+        self._ensure_index()
+        key = (self._index_day_start, self.schedule, self.schedule_date, len(self.hub.archive))
+        if key != self._stats_key:
+            self._stats = self._compute_stats()
+            self._stats_key = key
+        return self._stats
+
+    def _compute_stats(self) -> dict[str, float | None]:
+        today = self._index_day_start.date()  # type: ignore[union-attr]
+        # Archived days are final, only the ones not seen yet are read
+        since = max(self._past_off_slots, default=today - timedelta(days=STATS_DAYS)) + timedelta(days=1)
+        for day, _, schedule in self.hub.archive.query(since, today - timedelta(days=1), self.group):
+            self._past_off_slots[day] = schedule.count(STATE_OFF)
+        for day in [day for day in self._past_off_slots if (today - day).days >= STATS_DAYS]:
+            del self._past_off_slots[day]
+
+        off_slots = dict(self._past_off_slots)
+        # Days of the schedule that have passed count as well until they are archived
+        for offset, schedule in enumerate(self.schedule.days):
+            off_slots[self.first_day + timedelta(days=offset)] = schedule.count(STATE_OFF)
+        slot_hours = SLOT_MINUTES / 60
+
+        def off_hours(first: date, days: int) -> float:
+            return sum(off_slots.get(first + timedelta(days=n), 0) for n in range(days)) * slot_hours
+
+        days = self.days_from_today
+        today_schedule = days[0] if days else DaySchedule()
+        return {
+            "off_hours_today": today_schedule.count(STATE_OFF) * slot_hours,
+            "off_hours_tomorrow": days[1].count(STATE_OFF) * slot_hours if len(days) > 1 else None,
+            "off_hours_week": off_hours(today - timedelta(days=today.weekday()), 7),
+            "longest_outage_today": today_schedule.longest_run(STATE_OFF) * slot_hours,
+            "possible_on_share_today": 100 * today_schedule.count(STATE_POSSIBLE_ON) / SLOTS_PER_DAY,
+            "off_hours_7d": off_hours(today - timedelta(days=6), 7),
+            "off_hours_30d": off_hours(today - timedelta(days=STATS_DAYS - 1), STATS_DAYS),
+        }
+
+    def _get_next_power_change_dt(self, on: bool) -> datetime | None:
+        """Get the next power on/off within TIMEFRAME_TO_CHECK."""
+        now = dt_util.now()
+        self._ensure_index()
+        limit = now + TIMEFRAME_TO_CHECK
+        for idx in range(bisect_right(self._transitions, now), len(self._transitions)):
+            dt = self._transitions[idx]
+            if dt > limit:
+                break
+            # Power off starts an OFF or POSSIBLE_ON event, power on ends one
+            if on and idx > 0 and self._states[idx - 1] != STATE_ON:
+                return dt
+            if not on and self._states[idx] != STATE_ON:
+                return dt
         return None
 
     @property
@@ -95,57 +424,80 @@ class ChernivtsiPowerOffCoordinator(DataUpdateCoordinator):
     def next_poweron(self) -> datetime | None:
         """Get next connectivity time."""
         dt = self._get_next_power_change_dt(on=True)
-        LOGGER.debug("Next powerof: %s", dt)
+        LOGGER.debug("Next poweron: %s", dt)
         return dt
 
     @property
     def current_state(self) -> str:
         """Get the current state."""
         now = dt_util.now()
-        # OFF event has priority
-        off_event = self.get_event_at(now)
-        if off_event:
-            return STATE_OFF
-        # If any POSSIBLE_ON period matches now, reflect that
-        for period in self.periods:
-            if period.state != STATE_POSSIBLE_ON:
-                continue
-            start, end = period.to_datetime_period(now.tzinfo)
-            if start <= now <= end:
-                return STATE_POSSIBLE_ON
-        return STATE_ON
+        self._ensure_index()
+        idx = bisect_right(self._transitions, now) - 1
+        return self._states[idx] if idx >= 0 else STATE_ON
+
+    @property
+    def events(self) -> list[CalendarEvent]:
+        """Get the sorted OFF and POSSIBLE_ON events of the schedule.
+
+        The list is rebuilt after a refresh or midnight and must not be mutated.
+        """
+        self._ensure_index()
+        return self._events
+
+    @property
+    def schedule_start(self) -> datetime:
+        """Get the local midnight the schedule starts at, earlier days are archived."""
+        self._ensure_index()
+        return self._schedule_start  # type: ignore[return-value]
 
     def get_event_at(self, at: datetime) -> CalendarEvent | None:
-        """Get the current event."""
-        # Check OFF periods first (higher priority)
-        for period in self.periods:
-            if period.state == STATE_OFF:
-                start, end = period.to_datetime_period(at.tzinfo)
-                if start <= at <= end:
-                    return self._get_calendar_event(start, end, STATE_OFF)
-        # Check POSSIBLE_ON periods
-        for period in self.periods:
-            if period.state == STATE_POSSIBLE_ON:
-                start, end = period.to_datetime_period(at.tzinfo)
-                if start <= at <= end:
-                    return self._get_calendar_event(start, end, STATE_POSSIBLE_ON)
-        return None
+        """Get the OFF or POSSIBLE_ON event in progress at the given time.
+
+        Events are cached until the next refresh or midnight and must not be mutated.
+        """
+        self._ensure_index()
+        idx = bisect_right(self._event_starts, at) - 1
+        if idx < 0 or at >= self._event_ends[idx]:
+            return None
+        return self._events[idx]
 
     def get_events_between(
         self,
         start_date: datetime,
         end_date: datetime,
     ) -> list[CalendarEvent]:
-        """Get all events (both OFF and POSSIBLE_ON periods)."""
-        events = []
-        for period in self.periods:
-            if period.state not in (STATE_OFF, STATE_POSSIBLE_ON):
-                continue
-            start, end = period.to_datetime_period(start_date.tzinfo)
-            if start_date <= start <= end_date or start_date <= end <= end_date:
-                events.append(self._get_calendar_event(start, end, period.state))
+        """Get all events (both OFF and POSSIBLE_ON periods) overlapping the window.
+
+        Events are sorted and disjoint, so both ends are found by bisection.
+        Days before the schedule's first day are served from the hub's archive.
+        """
+        self._ensure_index()
+        first = bisect_right(self._event_ends, start_date)
+        last = bisect_left(self._event_starts, end_date)
+        events = self._events[first:last]
+        if start_date < self._schedule_start:  # type: ignore[operator]
+            events = self._get_archived_events(start_date, end_date) + events
         return events
 
+    def _get_archived_events(self, start_date: datetime, end_date: datetime) -> list[CalendarEvent]:
+        """Build the events of the archived days of the group overlapping the window."""
+        last_archived = self._schedule_start.date() - timedelta(days=1)  # type: ignore[union-attr]
+        last_day = min(dt_util.as_local(end_date).date(), last_archived)
+        events: list[CalendarEvent] = []
+        for day, _, schedule in self.hub.archive.query(dt_util.as_local(start_date).date(), last_day, self.group):
+            day_start = local_date_start(day)
+            day_events = [
+                self._get_calendar_event(
+                    day_start + timedelta(minutes=start * SLOT_MINUTES),
+                    day_start + timedelta(minutes=end * SLOT_MINUTES),
+                    state,
+                )
+                for state in (STATE_OFF, STATE_POSSIBLE_ON)
+                for start, end in schedule.runs(state)
+            ]
+            events += sorted(day_events, key=lambda event: event.start)
+        return [event for event in events if event.end > start_date and event.start < end_date]
+
     def _get_calendar_event(self, start: datetime, end: datetime, state: str) -> CalendarEvent:
         """Create a calendar event with appropriate summary based on state."""
         return CalendarEvent(
@@ -159,9 +511,20 @@ class ChernivtsiPowerOffCoordinator(DataUpdateCoordinator):
         """Get the last successful update timestamp."""
         return self.last_update
 
-    def update_group(self, new_group: PowerOffGroup) -> None:
-        """Update the group and recreate the scraper."""
+    @callback
+    def update_group(self, new_group: PowerOffGroup) -> bool:
+        """Switch to another group and drop the periods of the previous one.
+
+        When the hub's page is fresh the new group's schedule is published
+        right away and True is returned; otherwise the caller must refresh.
+        """
         self.group = new_group
-        self.api = EnergyUaScrapper(new_group)
-        self.periods = []
+        self.schedule = GroupSchedule()
+        self.schedule_date = None
         self.last_update = None
+        self._index_day_start = None
+        self._past_off_slots = {}
+        self._stats_key = None
+        self._async_cancel_transition()
+        max_age = self.update_interval.total_seconds() * PAGE_MAX_AGE_RATIO  # type: ignore[union-attr]
+        return self.hub.is_fresh(max_age) and self.async_restore()
@@ -0,0 +1,49 @@
+"""Diagnostics support for Chernivtsi PowerOff."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .aggregate import ChernivtsiPowerOffGroups
+from .const import SNAPSHOT_TOKEN_CONF
+
+TO_REDACT = {SNAPSHOT_TOKEN_CONF}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics of a config entry: the shared page, every group and the pipeline metrics."""
+    groups: ChernivtsiPowerOffGroups = entry.runtime_data
+    hub = groups.primary.hub
+    return {
+        "entry": {"data": async_redact_data(entry.data, TO_REDACT), "options": dict(entry.options)},
+        "hub": {
+            "snapshot_source": hub.snapshot_url,
+            "fetched_at": hub.fetched_at,
+            "content_hash": hub.content_hash,
+            "etag": hub.api.etag,
+            "last_modified": hub.api.last_modified,
+            "groups": sorted(hub.groups, key=int),
+            "archived_days": len(hub.archive),
+            "breaker": {
+                "state": hub.breaker.state,
+                "failures": hub.breaker.failures,
+                "retry_in": hub.breaker.retry_in,
+            },
+        },
+        "coordinators": [
+            {
+                "group": coordinator.group,
+                "update_interval": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+                "next_refresh": coordinator.next_refresh,
+                "next_transition": coordinator.next_transition,
+                "days": len(coordinator.schedule.days),
+                "transitions": len(coordinator._transitions),
+                "last_update": coordinator.last_update,
+                "data_age": coordinator.data_age.total_seconds() if coordinator.data_age else None,
+            }
+            for coordinator in groups.coordinators
+        ],
+        "metrics": hub.metrics.as_dict(),
+    }
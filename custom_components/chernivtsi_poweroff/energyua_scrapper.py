@@ -2,43 +2,206 @@
 
 The page `https://oblenergo.cv.ua/shutdowns/` contains per-group schedules in
 containers like `<div id="inf{group}" data-id="{group}">`. Inside each
-container there are 24 hour cells for today and (optionally) for tomorrow that
-show legend letters:
+container there are 48 half-hour cells for today and (optionally) for tomorrow
+that show legend letters:
   - "В" (off), "З" (on), "МЗ" (possible on).
 
 We collect contiguous periods for OFF ("В") to build calendar events and also
 collect POSSIBLE ON ("МЗ") periods to expose a third sensor state.
+
+`aiohttp` and `bs4` are imported on first use to keep them off the
+integration's import path. Parsing is CPU-bound and runs in an executor, the
+coroutines only do the network I/O.
 """
 
-import re
+from __future__ import annotations
 
-import aiohttp
-from bs4 import BeautifulSoup
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Collection
+from contextlib import asynccontextmanager
+from datetime import date
+from functools import partial
+import logging
+import random
+import time
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
 
-from .const import PowerOffGroup, STATE_OFF, STATE_POSSIBLE_ON
+from .const import FETCH_RETRIES, FETCH_RETRY_BACKOFF, FETCH_RETRY_JITTER, PowerOffGroup
 from .entities import PowerOffPeriod
+from .metrics import Metrics
+from .page_parser import (
+    HEADER_TAGS,
+    ROW_ATTR,
+    ROW_TAGS,
+    TAG_TOKENS,
+    TOKENS,
+    ParsedPage,
+    find_header_date,
+    parse_page,
+    split_days,
+)
+from .schedule import GroupSchedule
+
+if TYPE_CHECKING:
+    import aiohttp
+    from bs4 import Tag
+
+LOGGER = logging.getLogger(__name__)
 
 URL = "https://oblenergo.cv.ua/shutdowns/"
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
 
+# Connection pool and timeouts of the long-lived session (seconds)
+POOL_LIMIT = 4
+POOL_LIMIT_PER_HOST = 2
+KEEPALIVE_TIMEOUT = 60
+DNS_CACHE_TTL = 3600
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+TOTAL_TIMEOUT = 60
+# Error statuses worth another attempt
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Parser backends: the streaming `page_parser` or the full BeautifulSoup tree
+PARSER_FAST = "fast"
+PARSER_BS4 = "bs4"
+
+
+def _trace_config(metrics: Metrics) -> aiohttp.TraceConfig:
+    """Time DNS lookups, connection setup (TCP and TLS) and the wait for response headers."""
+    import aiohttp
+
+    def on_start(stage: str) -> Callable[..., Awaitable[None]]:
+        async def handler(_session: object, context: SimpleNamespace, _params: object) -> None:
+            setattr(context, stage, time.perf_counter())
+
+        return handler
+
+    def on_end(stage: str) -> Callable[..., Awaitable[None]]:
+        async def handler(_session: object, context: SimpleNamespace, _params: object) -> None:
+            if (started := getattr(context, stage, None)) is not None:
+                metrics.record(stage, time.perf_counter() - started)
+
+        return handler
+
+    def on_count(counter: str) -> Callable[..., Awaitable[None]]:
+        async def handler(_session: object, _context: SimpleNamespace, _params: object) -> None:
+            metrics.count(counter)
+
+        return handler
+
+    trace = aiohttp.TraceConfig()
+    trace.on_dns_resolvehost_start.append(on_start("dns"))
+    trace.on_dns_resolvehost_end.append(on_end("dns"))
+    trace.on_connection_create_start.append(on_start("connect"))
+    trace.on_connection_create_end.append(on_end("connect"))
+    trace.on_request_start.append(on_start("response_headers"))
+    trace.on_request_end.append(on_end("response_headers"))
+    trace.on_dns_cache_hit.append(on_count("dns_cache_hits"))
+    trace.on_connection_reuseconn.append(on_count("connections_reused"))
+    return trace
+
+
+def _client_timeout() -> aiohttp.ClientTimeout:
+    import aiohttp
+
+    return aiohttp.ClientTimeout(total=TOTAL_TIMEOUT, sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+
+
+def is_transient(err: BaseException) -> bool:
+    """Return True for fetch errors that may go away when retried."""
+    import aiohttp
+
+    if isinstance(err, aiohttp.ClientResponseError):
+        return err.status in RETRY_STATUSES
+    return isinstance(err, (aiohttp.ClientError, TimeoutError))
+
+
+def create_session(metrics: Metrics | None = None) -> aiohttp.ClientSession:
+    """Create a pooled keep-alive session for the shutdowns page.
+
+    Must be called from the event loop; the owner is responsible for closing it.
+    With `metrics` the DNS, connect and response header times are recorded.
+    """
+    import aiohttp
+
+    from homeassistant.util.ssl import client_context
+
+    connector = aiohttp.TCPConnector(
+        limit=POOL_LIMIT,
+        limit_per_host=POOL_LIMIT_PER_HOST,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        ssl=client_context(),
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={"User-Agent": USER_AGENT},
+        timeout=_client_timeout(),
+        trace_configs=[_trace_config(metrics)] if metrics is not None else None,
+    )
+
+
+def parse_schedules(content: str, parser: str = PARSER_FAST) -> tuple[dict[str, GroupSchedule], date | None]:
+    """Parse the whole page into per-group schedules and the date of their first day.
+
+    Module-level and free of shared state so that it can be sent to a worker process.
+    """
+    page = EnergyUaScrapper(parser=parser).parse_page(content)
+    return {group: GroupSchedule.from_tokens(tokens) for group, tokens in page.groups.items()}, page.first_day
+
+
 class EnergyUaScrapper:
     """Scrape OFF and POSSIBLE ON periods for a selected group."""
 
-    def __init__(self, group: PowerOffGroup) -> None:
-        """Initialize the EnergyUaScrapper object."""
+    def __init__(
+        self,
+        group: PowerOffGroup | None = None,
+        session: aiohttp.ClientSession | None = None,
+        parser: str = PARSER_FAST,
+        metrics: Metrics | None = None,
+        url: str = URL,
+    ) -> None:
+        """Initialize the EnergyUaScrapper object.
+
+        The group may be omitted when the scrapper is only used to fetch and
+        parse the whole page (see `parse_groups`). When no session is injected
+        a short-lived one is opened for every request. `parser` selects the
+        backend used to read the group containers (PARSER_FAST or PARSER_BS4).
+        Fetch and parse counters and timings go to `metrics`. `url` points
+        the scrapper at another shutdowns page, e.g. a local test server.
+        """
         self.group = group
+        self.url = url
+        self.session = session
+        self.parser = parser
+        self.metrics = metrics or Metrics()
+        # Validators of the last full response, sent back on conditional fetches
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        # Retries of transient fetch errors and the base delay between them (seconds)
+        self.retries = FETCH_RETRIES
+        self.retry_backoff = FETCH_RETRY_BACKOFF
+
+    @asynccontextmanager
+    async def _get(
+        self, headers: dict[str, str] | None = None, url: str | None = None
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Issue a GET for the shutdowns page (or `url`) on the injected or a temporary session."""
+        headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        url = url or self.url
+        if self.session is not None:
+            async with self.session.get(url, headers=headers) as response:
+                yield response
+            return
+        import aiohttp
 
-    async def validate(self) -> bool:
         async with (
-            aiohttp.ClientSession(headers={"User-Agent": USER_AGENT}) as session,
-            session.get(URL) as response,
+            aiohttp.ClientSession(timeout=_client_timeout()) as session,
+            session.get(url, headers=headers) as response,
         ):
-            if response.status != 200:
-                return False
-            content = await response.text()
-            soup = BeautifulSoup(content, "html.parser")
-            container = soup.select_one(f"div#inf{self.group}[data-id='{self.group}']")
-            return container is not None
+            yield response
 
     @staticmethod
     def merge_periods(periods: list[PowerOffPeriod]) -> list[PowerOffPeriod]:
@@ -57,64 +220,163 @@ class EnergyUaScrapper:
 
         return merged_periods
 
-    async def get_power_off_periods(self) -> list[PowerOffPeriod]:
-        async with (
-            aiohttp.ClientSession(headers={"User-Agent": USER_AGENT}) as session,
-            session.get(URL) as response,
-        ):
-            content = await response.text()
+    async def fetch_page(self, conditional: bool = False) -> str | None:
+        """Download the shutdowns page.
+
+        With `conditional` the ETag/Last-Modified of the previous response are
+        sent back and None is returned when the server answers 304 Not Modified.
+        Error statuses raise aiohttp.ClientResponseError; transient errors
+        (connection failures, timeouts, 429 and 5xx) are retried with a
+        jittered exponential backoff before giving up.
+        """
+        return await self._fetch(conditional, text=True)  # type: ignore[return-value]
+
+    async def fetch_snapshot(self, url: str, token: str | None = None, conditional: bool = False) -> bytes | None:
+        """Download a schedule snapshot published by another instance.
+
+        `token` is sent as a bearer token; conditional fetches, errors and
+        retries work as in `fetch_page`.
+        """
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        return await self._fetch(conditional, url, headers, text=False)  # type: ignore[return-value]
+
+    async def _fetch(
+        self,
+        conditional: bool,
+        url: str | None = None,
+        headers: dict[str, str] | None = None,
+        text: bool = True,
+    ) -> str | bytes | None:
+        """Return the decoded (or raw) body of a GET, None on 304, retrying transient errors."""
+        for attempt in range(self.retries):
+            try:
+                return await self._fetch_once(conditional, url, headers, text)
+            except Exception as err:
+                if not is_transient(err):
+                    raise
+                delay = self.retry_backoff * 2**attempt
+                delay *= random.uniform(1 - FETCH_RETRY_JITTER, 1 + FETCH_RETRY_JITTER)
+                LOGGER.debug("Fetching %s failed (%s), retrying in %.1f s", url or self.url, err, delay)
+                self.metrics.count("retries")
+                await asyncio.sleep(delay)
+        return await self._fetch_once(conditional, url, headers, text)
+
+    async def _fetch_once(
+        self, conditional: bool, url: str | None, extra_headers: dict[str, str] | None, text: bool
+    ) -> str | bytes | None:
+        headers: dict[str, str] = {}
+        if conditional and self.etag:
+            headers["If-None-Match"] = self.etag
+        if conditional and self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        self.metrics.count("requests")
+        with self.metrics.timed("fetch"):
+            async with self._get({**headers, **(extra_headers or {})}, url) as response:
+                if response.status == 304 and headers:
+                    self.metrics.count("not_modified")
+                    return None
+                response.raise_for_status()
+                with self.metrics.timed("download"):
+                    body = await response.read()
+                self.metrics.count("bytes_downloaded", len(body))
+                self.etag = response.headers.get("ETag")
+                self.last_modified = response.headers.get("Last-Modified")
+                return body.decode(response.get_encoding()) if text else body
+
+    def parse_groups(self, content: str, groups: Collection[str] | None = None) -> dict[str, list[list[str]]]:
+        """Parse the page once and extract per-day tokens for every group container.
+
+        `groups` limits parsing to the given group containers.
+        """
+        return self.parse_page(content, groups).groups
+
+    def parse_page(self, content: str, groups: Collection[str] | None = None) -> ParsedPage:
+        """Parse the page into per-day tokens of the group containers and the date of their first day.
+
+        Raises PageStructureError when a container does not hold whole days.
+        """
+        if self.parser == PARSER_FAST:
+            with self.metrics.timed("parse"):
+                return parse_page(content, groups)
+
+        from bs4 import BeautifulSoup
+
+        with self.metrics.timed("parse"):
             soup = BeautifulSoup(content, "html.parser")
+        result: dict[str, list[list[str]]] = {}
+        parsed: set[int] = set()
+        with self.metrics.timed("tokenize"):
+            for container in soup.select("div[id^='inf'][data-id]"):
+                group = container.get("data-id")
+                if container.get("id") != f"inf{group}" or group in result:
+                    continue
+                if groups is not None and group not in groups:
+                    continue
+                result[group] = self._extract_tokens(container)
+                parsed.add(id(container))
+            first_day = next(
+                (
+                    day
+                    for heading in soup.find_all(HEADER_TAGS)
+                    if not any(id(parent) in parsed for parent in heading.parents)
+                    and (day := find_header_date(heading.get_text())) is not None
+                ),
+                None,
+            )
+        return ParsedPage(result, first_day)
 
-        container = soup.select_one(f"div#inf{self.group}[data-id='{self.group}']")
-        if container is None:
-            return []
+    def periods_from_tokens(self, tokens: list[list[str]]) -> list[PowerOffPeriod]:
+        """Build OFF and POSSIBLE ON periods from per-day tokens (today first)."""
+        return list(GroupSchedule.from_tokens(tokens).periods)
 
-        # Extract sequence of 24 symbols per day (today first, then tomorrow if present)
-        tokens = self._extract_tokens(container)
-        results: list[PowerOffPeriod] = []
-        for day_idx, day_tokens in enumerate(tokens):
-            periods_off = self._tokens_to_periods(day_tokens, target="В")
-            results += [PowerOffPeriod(s, e, today=(day_idx == 0), state=STATE_OFF) for s, e in periods_off]
-            periods_possible = self._tokens_to_periods(day_tokens, target="МЗ")
-            results += [PowerOffPeriod(s, e, today=(day_idx == 0), state=STATE_POSSIBLE_ON) for s, e in periods_possible]
+    async def get_power_off_periods(self) -> list[PowerOffPeriod]:
+        content = await self.fetch_page()
 
-        return results
+        # Extract sequence of 24 symbols per day (today first, then tomorrow if present),
+        # parsing in the loop's default executor
+        groups = await asyncio.get_running_loop().run_in_executor(
+            None, partial(self.parse_groups, content, [str(self.group)])
+        )
+        tokens = groups.get(str(self.group))
+        if tokens is None:
+            return []
+        return self.periods_from_tokens(tokens)
 
-    def _extract_tokens(self, container: BeautifulSoup) -> list[list[str]]:
-        """Extract per-hour tokens from the group's container.
+    def _extract_tokens(self, container: Tag) -> list[list[str]]:
+        """Extract per-day half-hour tokens from the group's container.
 
-        Heuristic: scan all descendants and collect text nodes that are exactly one
-        of {"В", "З", "МЗ"}. The first 24 belong to today, the next 24 (if any)
-        belong to tomorrow.
+        Walk the container once, depth first, and classify every element by
+        its own text when it is exactly one of {"В", "З", "МЗ"}, otherwise by
+        its tag. The walk carries the nearest enclosing day row down to the
+        cells, which are split into days by it the way `page_parser` does;
+        PageStructureError is raised when a day is not exactly 48 cells.
         """
-        raw = []
-        for el in container.find_all(True):
-            text = (el.get_text(strip=True) or "").upper()
-            if text not in {"В", "З", "МЗ"}:
-                # On the site letters can be implicit via tag name: <u>=З, <s>=МЗ, <o>=В
-                tag = el.name.lower() if hasattr(el, "name") and el.name else ""
-                if tag == "u":
-                    text = "З"
-                elif tag == "s":
-                    text = "МЗ"
-                elif tag == "o":
-                    text = "В"
-            if text in {"В", "З", "МЗ"}:
-                raw.append(text)
-
-        # chunk into days by 48 half-hour slots
-        days: list[list[str]] = []
-        while raw:
-            days.append(raw[:48])
-            raw = raw[48:]
-            if len(days[-1]) < 48:
-                # pad if fewer cells found to avoid index errors
-                days[-1] += ["З"] * (48 - len(days[-1]))
-            if len(days) == 2:
-                break
-        if not days:
-            days = [["З"] * 48]
-        return days
+        from bs4 import NavigableString, Tag
+
+        segments: list[list[str]] = []
+        # Row of the current segment; the container itself never is one, so the first cell opens a segment
+        segment_row: Tag | None = container
+        # (element, nearest enclosing row) still to visit, the next one on top
+        stack: list[tuple[Tag, Tag | None]] = [(container, None)]
+        while stack:
+            el, row = stack.pop()
+            contents = el.contents
+            if el is not container:
+                text = "".join(child for child in contents if type(child) is NavigableString).strip().upper()
+                if text not in TOKENS:
+                    # On the site letters can be implicit via tag name: <u>=З, <s>=МЗ, <o>=В
+                    text = TAG_TOKENS.get(el.name.lower())
+                if text is not None:
+                    if row is not segment_row:
+                        segments.append([])
+                        segment_row = row
+                    segments[-1].append(text)
+                if el.name in ROW_TAGS or ROW_ATTR in el.attrs:
+                    row = el
+            for child in reversed(contents):
+                if isinstance(child, Tag):
+                    stack.append((child, row))
+        return split_days(str(container.get("data-id")), segments)
 
     def _tokens_to_periods(self, tokens: list[str], target: str) -> list[tuple[int, int]]:
         """Convert sequence of 48 half-hour tokens to minute-based periods for a token."""
@@ -1,10 +1,37 @@
 """Module for power off period entities."""
 
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, tzinfo
+
+from homeassistant.util import dt as dt_util
 
 from .const import STATE_OFF
 
+# Cached local midnight per time zone: tz -> (start of today, start of tomorrow)
+_DAY_STARTS: dict[tzinfo, tuple[datetime, datetime]] = {}
+
+
+def local_date_start(day: date, tz_info: tzinfo | None = None) -> datetime:
+    """Return the local midnight a date starts at, in Home Assistant's time zone by default."""
+    return datetime.combine(day, time(), tzinfo=tz_info or dt_util.DEFAULT_TIME_ZONE)
+
+
+def local_day_start(tz_info: tzinfo | None = None) -> datetime:
+    """Return the start of the current local day, computed once per day per time zone.
+
+    The same object is returned for the whole day, so callers can detect a date
+    rollover by identity. Without tz_info Home Assistant's time zone is used.
+    """
+    tz_info = tz_info or dt_util.DEFAULT_TIME_ZONE
+    now = dt_util.now(tz_info)
+    cached = _DAY_STARTS.get(tz_info)
+    if cached is not None and cached[0] <= now < cached[1]:
+        return cached[0]
+    start = local_date_start(now.date(), tz_info)
+    _DAY_STARTS[tz_info] = (start, local_date_start(now.date() + timedelta(days=1), tz_info))
+    return start
+
+
 @dataclass
 class PowerOffPeriod:
     """Class for power off period."""
@@ -13,25 +40,29 @@ class PowerOffPeriod:
     end: int    # minutes from day's start
     today: bool
     state: str = STATE_OFF
+    # (day start, start, end, resolved start, resolved end) of the last conversion
+    _resolved: tuple[datetime, int, int, datetime, datetime] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def to_datetime_period(self, tz_info: tzinfo | None = None) -> tuple[datetime, datetime]:
+        """Convert to datetime period.
 
-    def to_datetime_period(self, tz_info) -> tuple[datetime, datetime]:
-        """Convert to datetime period."""
-        now = datetime.now().replace(tzinfo=tz_info)
-        if not self.today:
-            now += timedelta(days=1)
-
-        # Normalize start and end to be within 0-1439 minutes (0:00-23:59)
-        start_minutes = self.start % 1440
-        end_minutes = self.end % 1440
-        
-        start_hour, start_minute = divmod(start_minutes, 60)
-        end_hour, end_minute = divmod(end_minutes, 60)
-        
-        start = now.replace(hour=start_hour, minute=start_minute, second=0, microsecond=0)
-        end = now.replace(hour=end_hour, minute=end_minute, second=0, microsecond=0)
-        
-        # If end is before start or end is exactly 24:00 (1440 minutes), it's next day
-        if end < start or self.end >= 1440:
+        Minutes are added to the local midnight as wall-clock time, so periods
+        stay correct across DST changes. The result is memoized until the date
+        rolls over or the period is modified.
+        """
+        today_start = local_day_start(tz_info)
+        resolved = self._resolved
+        if resolved is not None and resolved[0] is today_start and resolved[1:3] == (self.start, self.end):
+            return resolved[3], resolved[4]
+
+        day_start = today_start if self.today else today_start + timedelta(days=1)
+        start = day_start + timedelta(minutes=self.start)
+        end = day_start + timedelta(minutes=self.end)
+        # If end is before start, it belongs to the next day
+        if end < start:
             end += timedelta(days=1)
-        
+
+        self._resolved = (today_start, self.start, self.end, start, end)
         return start, end
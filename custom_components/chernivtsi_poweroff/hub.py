@@ -0,0 +1,398 @@
+"""Shared page fetcher for all Chernivtsi PowerOff config entries.
+
+Every group lives on the same shutdowns page, so a single hub stored in
+`hass.data[DOMAIN]` downloads and parses it once and serves all coordinators
+from that result. Days that have passed are moved to the schedule archive.
+While an entry sets a snapshot source the hub imports the schedules
+published by another instance (see `snapshot`) instead of scraping the page
+itself. The source is integration-wide: it switches every entry.
+"""
+
+import asyncio
+from collections.abc import Callable, Collection
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+import hashlib
+import logging
+import multiprocessing
+from pathlib import Path
+import time
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.util import dt as dt_util
+
+from .archive import RECORD, ScheduleArchive
+from .breaker import CircuitBreaker
+from .const import (
+    BREAKER_COOLDOWN,
+    BREAKER_THRESHOLD,
+    CACHE_MAX_AGE,
+    DOMAIN,
+    MAX_BREAKER_COOLDOWN,
+    PROCESS_POOL_MIN_PAGE_SIZE,
+    PowerOffGroup,
+)
+from .energyua_scrapper import URL, EnergyUaScrapper, create_session, parse_schedules
+from .metrics import Metrics
+from .page_parser import PageStructureError
+from .schedule import DaySchedule, GroupSchedule
+from .snapshot import Snapshot, SnapshotError, decode_snapshot, encode_snapshot
+
+LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 2
+STORAGE_KEY = f"{DOMAIN}.schedule_cache"
+STORAGE_SAVE_DELAY = 10
+ARCHIVE_FILE = f"{DOMAIN}.archive"
+
+
+class ScheduleCacheStore(Store[dict[str, Any]]):
+    """Schedule cache that migrates the data of older versions."""
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: dict[str, Any]
+    ) -> dict[str, Any]:
+        if old_major_version == 1:
+            # Version 1 did not store the first day of the schedules, the fetch date is the best guess
+            fetched_at = dt_util.parse_datetime(old_data.get("fetched_at") or "")
+            old_data["first_day"] = dt_util.as_local(fetched_at).date().isoformat() if fetched_at else None
+        return old_data
+
+
+class ChernivtsiPowerOffHub:
+    """Fetch the shutdowns page once per cycle and share it between groups."""
+
+    def __init__(self, hass: HomeAssistant, process_pool_min_size: int | None = None, url: str = URL) -> None:
+        """Initialize the hub.
+
+        Pages of at least `process_pool_min_size` characters are parsed in a
+        worker process instead of Home Assistant's thread executor; None
+        (the default) keeps every parse in a thread. `url` overrides the
+        shutdowns page, e.g. to run against a local test server.
+        """
+        self.hass = hass
+        self.process_pool_min_size = process_pool_min_size
+        self._process_pool: ProcessPoolExecutor | None = None
+        self.metrics = Metrics()
+        self.api = EnergyUaScrapper(metrics=self.metrics, url=url)
+        self.breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN, MAX_BREAKER_COOLDOWN)
+        # Snapshot published by another instance, imported instead of scraping the page,
+        # and the (URL, token) sources of the entries that set one, the first one wins
+        self.snapshot_url: str | None = None
+        self.snapshot_token: str | None = None
+        self._snapshot_sources: dict[str, tuple[str, str | None]] = {}
+        self._snapshot: bytes | None = None
+        self._snapshot_key: tuple[str | None, date, datetime] | None = None
+        self.entries: set[str] = set()
+        self._schedules: dict[str, GroupSchedule] = {}
+        # Local date of the first day of the parsed schedules
+        self._schedules_date: date | None = None
+        self.archive = ScheduleArchive(Path(hass.config.path(STORAGE_DIR, ARCHIVE_FILE)))
+        self._fetched_at: float | None = None
+        self.fetched_at: datetime | None = None
+        self.content_hash: str | None = None
+        self._pending: asyncio.Task | None = None
+        self._unsub_close: Callable[[], None] | None = None
+        self._store = ScheduleCacheStore(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._load_task: asyncio.Task | None = None
+
+    @property
+    def groups(self) -> set[str]:
+        """Return the groups found on the most recently parsed page."""
+        return set(self._schedules)
+
+    @property
+    def schedules_date(self) -> date | None:
+        """Return the local date of the first day of the parsed schedules."""
+        return self._schedules_date
+
+    @callback
+    def async_set_snapshot_source(self, entry_id: str, url: str | None, token: str | None = None) -> None:
+        """Set the snapshot source of an entry, or remove it when url is None.
+
+        While any entry has a source, every group is imported from the
+        snapshot of the first such entry; once none is left the hub goes back
+        to scraping the page.
+        """
+        if url is None:
+            self._snapshot_sources.pop(entry_id, None)
+        else:
+            self._snapshot_sources[entry_id] = (url, token)
+        url, token = next(iter(self._snapshot_sources.values()), (None, None))
+        if url != self.snapshot_url:
+            LOGGER.info("Schedules are now %s", f"imported from {url}" if url else "scraped from the shutdowns page")
+            # The validators and the age of the schedules belong to the previous source
+            self.api.etag = self.api.last_modified = None
+            self._fetched_at = None
+        self.snapshot_url, self.snapshot_token = url, token
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Return True when the parsed page is younger than max_age seconds."""
+        return self._fetched_at is not None and time.monotonic() - self._fetched_at <= max_age
+
+    def get_cached_schedule(self, group: PowerOffGroup) -> GroupSchedule | None:
+        """Return the schedule of a group from the last parsed page without fetching."""
+        return self._schedules.get(str(group))
+
+    async def async_get_schedule(self, group: PowerOffGroup, max_age: float) -> GroupSchedule:
+        """Return the schedule of a group, fetching the page if the cached one is too old.
+
+        When the fetch fails (or the breaker is open) the last parsed page is
+        served as long as it is younger than CACHE_MAX_AGE.
+        """
+        if self.is_fresh(max_age):
+            self.metrics.count("cache_hits")
+        else:
+            self.metrics.count("cache_misses")
+            try:
+                await self.async_refresh()
+            except Exception as err:
+                if not self._schedules or not self.is_fresh(CACHE_MAX_AGE):
+                    raise
+                LOGGER.debug("Serving the schedules fetched at %s: %s", self.fetched_at, err)
+                self.metrics.count("stale_served")
+        return self._schedules.get(str(group), GroupSchedule())
+
+    async def async_has_groups(self, groups: Collection[PowerOffGroup], max_age: float) -> bool:
+        """Return True when the page lists every group.
+
+        Answered from the last parsed (or restored) page when it is younger
+        than max_age seconds, otherwise the page is fetched once and kept for
+        the coordinators.
+        """
+        await self.async_load()
+        if not self.is_fresh(max_age):
+            await self.async_refresh()
+        return {str(group) for group in groups} <= self._schedules.keys()
+
+    async def async_load(self) -> None:
+        """Restore the last parsed page from disk (only once)."""
+        if self._load_task is None:
+            self._load_task = self.hass.async_create_task(self._async_load(), f"{DOMAIN} cache load")
+        task = self._load_task
+        try:
+            await asyncio.shield(task)
+        except Exception:
+            # Let the next entry setup try again instead of failing on the cached error
+            if self._load_task is task:
+                self._load_task = None
+            raise
+
+    async def _async_load(self) -> None:
+        await self.hass.async_add_executor_job(self.archive.load)
+        data = await self._store.async_load()
+        if not data or self._fetched_at is not None:
+            return
+        try:
+            fetched_at = dt_util.parse_datetime(data["fetched_at"])
+            first_day = dt_util.parse_date(data["first_day"] or "")
+            if fetched_at is None or first_day is None or fetched_at > dt_util.utcnow():
+                return
+            schedules = {
+                str(group): GroupSchedule([DaySchedule(int(off), int(possible_on)) for off, possible_on in days])
+                for group, days in data["groups"].items()
+            }
+            content_hash = data["content_hash"]
+        except (AttributeError, KeyError, TypeError, ValueError):
+            LOGGER.warning("Ignoring invalid schedule cache")
+            return
+        # Days that have passed since are archived even when the cache is too old to be restored
+        self._schedules = schedules
+        self._schedules_date = first_day
+        self.content_hash = content_hash
+        await self._async_archive_past_days()
+        age = dt_util.utcnow() - fetched_at
+        if age > timedelta(seconds=CACHE_MAX_AGE):
+            LOGGER.debug("Ignoring schedule cache from %s", fetched_at)
+            self._schedules = {}
+            self._schedules_date = None
+            self.content_hash = None
+            return
+        self.fetched_at = fetched_at
+        self._fetched_at = time.monotonic() - age.total_seconds()
+        LOGGER.debug("Restored schedules of %d groups fetched at %s", len(self._schedules), fetched_at)
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        return {
+            "fetched_at": self.fetched_at.isoformat() if self.fetched_at else None,
+            "content_hash": self.content_hash,
+            "first_day": self._schedules_date.isoformat() if self._schedules_date else None,
+            "groups": {
+                group: [[day.off, day.possible_on] for day in schedule.days]
+                for group, schedule in self._schedules.items()
+            },
+        }
+
+    async def _async_archive_past_days(self) -> None:
+        """Move the days of the parsed schedules that have passed to the archive."""
+        if self._schedules_date is None:
+            return
+        today = dt_util.now().date()
+        shift = (today - self._schedules_date).days
+        if shift <= 0:
+            return
+        encoded = self.archive.add(
+            (self._schedules_date + timedelta(days=day_idx), group, day)
+            for group, schedule in self._schedules.items()
+            for day_idx, day in enumerate(schedule.days[:shift])
+        )
+        self._schedules = {group: GroupSchedule(schedule.days[shift:]) for group, schedule in self._schedules.items()}
+        self._schedules_date = today
+        # The page hash no longer describes the shifted days
+        self.content_hash = None
+        await self.hass.async_add_executor_job(self.archive.write, encoded)
+        LOGGER.debug("Archived %d group-days", len(encoded) // RECORD.size)
+
+    async def async_refresh(self) -> None:
+        """Fetch the page, joining a fetch that is already in progress."""
+        if self._pending is None or self._pending.done():
+            self._pending = self.hass.async_create_task(self._async_fetch(), f"{DOMAIN} page fetch")
+        await asyncio.shield(self._pending)
+
+    @callback
+    def _async_ensure_session(self) -> None:
+        """Open the pooled session on first use and close it when HA stops."""
+        if self.api.session is not None and not self.api.session.closed:
+            return
+        self.api.session = create_session(self.metrics)
+        if self._unsub_close is None:
+            self._unsub_close = self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_close_on_stop)
+
+    async def _async_close_on_stop(self, _event: Event) -> None:
+        self._unsub_close = None
+        await self.async_close()
+
+    async def async_close(self) -> None:
+        """Close the pooled session and the parser worker process."""
+        if self._unsub_close is not None:
+            self._unsub_close()
+            self._unsub_close = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        if self.api.session is not None:
+            await self.api.session.close()
+            self.api.session = None
+
+    async def _async_fetch(self) -> None:
+        await self._async_archive_past_days()
+        self.breaker.check()
+        self._async_ensure_session()
+        try:
+            if self.snapshot_url is not None:
+                LOGGER.debug("Fetching schedule snapshot from %s", self.snapshot_url)
+                content: str | bytes | None = await self.api.fetch_snapshot(
+                    self.snapshot_url, self.snapshot_token, conditional=bool(self._schedules)
+                )
+            else:
+                LOGGER.debug("Fetching shutdowns page")
+                content = await self.api.fetch_page(conditional=self.content_hash is not None)
+        except Exception:
+            if self.breaker.record_failure():
+                LOGGER.warning(
+                    "Shutdowns page failed %d times in a row, pausing fetches for %.0f s",
+                    self.breaker.failures,
+                    self.breaker.retry_in,
+                )
+                self.metrics.count("breaker_opened")
+            raise
+        self.breaker.record_success()
+        # The age of a snapshot is the age of the page it was taken from
+        fetched_at = dt_util.utcnow() if self.snapshot_url is None else self.fetched_at
+        if content is None:
+            LOGGER.debug("Shutdowns page not modified")
+        elif isinstance(content, bytes):
+            fetched_at = await self._async_import_snapshot(content)
+        elif (content_hash := hashlib.blake2b(content.encode(), digest_size=16).hexdigest()) == self.content_hash:
+            LOGGER.debug("Shutdowns page content unchanged, skipping parse")
+            self.metrics.count("pages_unchanged")
+        else:
+            await self._async_parse_page(content, content_hash)
+        self._fetched_at = time.monotonic()
+        self.fetched_at = fetched_at
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+
+    async def _async_import_snapshot(self, data: bytes) -> datetime:
+        """Replace the schedules with the ones of a snapshot, return when its page was fetched."""
+        try:
+            snapshot = decode_snapshot(data)
+            if snapshot.first_day > dt_util.now().date():
+                msg = f"Snapshot starts in the future ({snapshot.first_day})"
+                raise SnapshotError(msg)
+        except SnapshotError:
+            self.api.etag = self.api.last_modified = None
+            self.metrics.count("parse_errors")
+            raise
+        self.metrics.count("snapshots_imported")
+        self._schedules = snapshot.schedules
+        self._schedules_date = snapshot.first_day
+        self.content_hash = snapshot.content_hash
+        LOGGER.debug("Imported schedules of %d groups fetched at %s", len(snapshot.schedules), snapshot.fetched_at)
+        await self._async_archive_past_days()
+        return snapshot.fetched_at
+
+    def snapshot(self) -> bytes | None:
+        """Return the current schedules packed as a snapshot, None before the first page."""
+        if not self._schedules or self._schedules_date is None or self.fetched_at is None:
+            return None
+        key = (self.content_hash, self._schedules_date, self.fetched_at)
+        if key != self._snapshot_key:
+            self._snapshot = encode_snapshot(
+                Snapshot(self._schedules, self._schedules_date, self.fetched_at, self.content_hash)
+            )
+            self._snapshot_key = key
+        return self._snapshot
+
+    async def _async_parse_page(self, content: str, content_hash: str) -> None:
+        """Replace the schedules with the ones of a new page, unless its layout is broken."""
+        self.metrics.count("pages_parsed")
+        try:
+            with self.metrics.timed("parse_job"):
+                schedules, first_day = await self._async_parse(content)
+            if not schedules:
+                msg = "The page lists no group containers"
+                raise PageStructureError(msg)
+        except PageStructureError:
+            # Keep the last good page; the validators belong to the rejected one,
+            # so the next fetch downloads the page in full
+            self.api.etag = self.api.last_modified = None
+            self.metrics.count("parse_errors")
+            raise
+        today = dt_util.now().date()
+        if first_day not in (today, today - timedelta(days=1)):
+            if first_day is not None:
+                LOGGER.debug("Ignoring the page date %s, the schedules are taken as of today", first_day)
+            first_day = today
+        self._schedules = schedules
+        self._schedules_date = first_day
+        self.content_hash = content_hash
+        LOGGER.debug("Parsed %d group containers starting on %s", len(schedules), first_day)
+        # Shortly after midnight the page may still start with yesterday
+        await self._async_archive_past_days()
+
+    async def _async_parse(self, content: str) -> tuple[dict[str, GroupSchedule], date | None]:
+        """Parse the page off the event loop."""
+        if self.process_pool_min_size is not None and len(content) >= self.process_pool_min_size:
+            if self._process_pool is None:
+                # Forking a process with running threads is unsafe, start a clean interpreter
+                self._process_pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+            return await self.hass.loop.run_in_executor(self._process_pool, parse_schedules, content, self.api.parser)
+        return await self.hass.async_add_executor_job(self._parse, content)
+
+    def _parse(self, content: str) -> tuple[dict[str, GroupSchedule], date | None]:
+        page = self.api.parse_page(content)
+        with self.metrics.timed("schedule_build"):
+            return {group: GroupSchedule.from_tokens(tokens) for group, tokens in page.groups.items()}, page.first_day
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> ChernivtsiPowerOffHub:
+    """Return the shared hub, creating it on first use."""
+    hub: ChernivtsiPowerOffHub | None = hass.data.get(DOMAIN)
+    if hub is None:
+        hub = hass.data[DOMAIN] = ChernivtsiPowerOffHub(hass, process_pool_min_size=PROCESS_POOL_MIN_PAGE_SIZE)
+    return hub
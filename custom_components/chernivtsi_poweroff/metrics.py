@@ -0,0 +1,116 @@
+"""Counters and stage timings of the fetch -> parse -> index pipeline.
+
+Counters (requests, bytes, cache hits, 304s, ...) are plain integer
+increments and always on. Stage timings are only taken while `enabled` is
+set, which is the case while at least one debug sensor is enabled; otherwise
+`timed` hands out a shared no-op context manager. The numbers are exposed
+through the config entry diagnostics and the debug sensors.
+"""
+
+from collections import Counter
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+import time
+from typing import Any
+
+_DISABLED = nullcontext()
+
+
+class StageTiming:
+    """Call count and durations (seconds) of a pipeline stage."""
+
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self) -> None:
+        """Initialize the timing."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Record one run of the stage."""
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the timing in milliseconds."""
+        return {
+            "count": self.count,
+            "last_ms": round(self.last * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class _Timer:
+    __slots__ = ("_timing", "_start")
+
+    def __init__(self, timing: StageTiming) -> None:
+        self._timing = timing
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._timing.add(time.perf_counter() - self._start)
+
+
+class Metrics:
+    """Pipeline counters and stage timings shared by the scraper, the hub and the coordinators."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics with timings disabled."""
+        self.enabled = False
+        self.counters: Counter[str] = Counter()
+        self.timings: dict[str, StageTiming] = {}
+        self._consumers = 0
+
+    def enable(self) -> Callable[[], None]:
+        """Switch the timings on for a consumer, return a callback that releases it.
+
+        The timings are switched off again when the last consumer is released.
+        """
+        self._consumers += 1
+        self.enabled = True
+
+        def release() -> None:
+            self._consumers -= 1
+            if not self._consumers:
+                self.enabled = False
+
+        return release
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increment a counter."""
+        self.counters[name] += value
+
+    def timed(self, stage: str) -> AbstractContextManager[None]:
+        """Return a context manager that times a stage while timings are enabled."""
+        if not self.enabled:
+            return _DISABLED
+        timing = self.timings.get(stage)
+        if timing is None:
+            timing = self.timings[stage] = StageTiming()
+        return _Timer(timing)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record a stage duration measured elsewhere."""
+        if self.enabled:
+            self.timings.setdefault(stage, StageTiming()).add(seconds)
+
+    def last_ms(self, stage: str) -> float | None:
+        """Return the last duration of a stage in milliseconds."""
+        timing = self.timings.get(stage)
+        return round(timing.last * 1000, 3) if timing else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics for diagnostics."""
+        return {
+            "timings_enabled": self.enabled,
+            "counters": dict(self.counters),
+            "timings": {stage: timing.as_dict() for stage, timing in self.timings.items()},
+        }
@@ -0,0 +1,202 @@
+"""Streaming parser for the group containers of the shutdowns page.
+
+Unlike the BeautifulSoup path this never builds a document tree: the page is
+fed through `html.parser.HTMLParser`, everything outside the
+`<div id="inf{group}" data-id="{group}">` containers is skipped and every cell
+inside them is turned into an hour token as soon as it is closed.
+
+A cell is an element whose own text is one of the legend letters or, when the
+letter is implicit, one of the `<u>`/`<s>`/`<o>` tags.
+
+Days are delimited by the container's row markup (`<tr>` or elements with a
+`data-date` attribute) when there is any, otherwise the cells are cut every
+48. Every day must have exactly 48 cells: anything else means the layout
+changed (or the page was truncated) and raises PageStructureError instead of
+being padded into a made-up schedule. The date (DD.MM.YYYY) in the schedule
+header, the first heading outside the containers that names the schedule
+("Графік ..."), tells which day the schedules start on; dates anywhere else on
+the page (news, update notes) are ignored.
+"""
+
+from collections.abc import Collection
+from datetime import date
+from html.parser import HTMLParser
+import re
+from typing import NamedTuple
+
+TOKENS = frozenset({"В", "З", "МЗ"})
+TAG_TOKENS = {"u": "З", "s": "МЗ", "o": "В"}
+VOID_ELEMENTS = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+)
+ROW_TAGS = frozenset({"tr"})
+ROW_ATTR = "data-date"
+DATE_PATTERN = re.compile(r"\b(\d{1,2})\.(\d{1,2})\.(\d{4})\b")
+HEADER_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+HEADER_KEYWORD = "графік"
+SLOTS_PER_DAY = 48
+
+
+class PageStructureError(ValueError):
+    """The page does not have the layout the parser relies on."""
+
+
+class ParsedPage(NamedTuple):
+    """Per-day tokens of the group containers and the date of their first day."""
+
+    groups: dict[str, list[list[str]]]
+    first_day: date | None
+
+
+def find_date(text: str) -> date | None:
+    """Return the first valid DD.MM.YYYY date in the text."""
+    for match in DATE_PATTERN.finditer(text):
+        day, month, year = map(int, match.groups())
+        try:
+            return date(year, month, day)
+        except ValueError:
+            continue
+    return None
+
+
+def find_header_date(text: str) -> date | None:
+    """Return the date of a schedule header, None for the text of any other heading."""
+    if HEADER_KEYWORD not in text.casefold():
+        return None
+    return find_date(text)
+
+
+def split_days(group: str, segments: list[list[str]]) -> list[list[str]]:
+    """Validate the cells of a container and return them per day.
+
+    `segments` holds the cells of every day row; a container without row
+    markup gives a single segment, which is cut every SLOTS_PER_DAY cells.
+    """
+    if len(segments) == 1:
+        cells = segments[0]
+        if len(cells) % SLOTS_PER_DAY:
+            msg = f"Group {group} has {len(cells)} cells, not a whole number of days"
+            raise PageStructureError(msg)
+        segments = [cells[start : start + SLOTS_PER_DAY] for start in range(0, len(cells), SLOTS_PER_DAY)]
+    if not segments:
+        msg = f"Group {group} has no cells"
+        raise PageStructureError(msg)
+    for index, cells in enumerate(segments, 1):
+        if len(cells) != SLOTS_PER_DAY:
+            msg = f"Group {group}: day {index} has {len(cells)} cells instead of {SLOTS_PER_DAY}"
+            raise PageStructureError(msg)
+    return segments
+
+
+class GroupTokensParser(HTMLParser):
+    """Collect the per-day tokens of every (or only the requested) group container."""
+
+    def __init__(self, groups: Collection[str] | None = None) -> None:
+        """Initialize the parser."""
+        super().__init__(convert_charrefs=True)
+        self.groups: dict[str, list[list[str]]] = {}
+        self.first_day: date | None = None
+        self._wanted = None if groups is None else {str(group) for group in groups}
+        self._group: str | None = None
+        # Cells are stored in document order; a slot stays None until its element
+        # is closed and turned out not to be a cell.
+        self._tokens: list[str | None] = []
+        # Token positions where a day row starts or ends
+        self._boundaries: list[int] = []
+        # Open elements inside the container: (tag, token slot, own text parts, is a day row)
+        self._stack: list[tuple[str, int, list[str], bool]] = []
+        # Open heading outside the containers and its text parts, until the page date is found
+        self._heading: tuple[str, list[str]] | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self._group is None:
+            if tag == "div":
+                self._enter_container(attrs)
+            elif tag in HEADER_TAGS and self.first_day is None:
+                self._heading = (tag, [])
+            return
+        if tag in VOID_ELEMENTS:
+            self.handle_startendtag(tag, attrs)
+            return
+        row = tag in ROW_TAGS or any(name == ROW_ATTR for name, _ in attrs)
+        if row:
+            self._boundaries.append(len(self._tokens))
+        self._tokens.append(None)
+        self._stack.append((tag, len(self._tokens) - 1, [], row))
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self._group is None:
+            return
+        if (token := TAG_TOKENS.get(tag)) is not None:
+            self._tokens.append(token)
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._group is None:
+            if self._heading is not None and self._heading[0] == tag:
+                self.first_day = find_header_date("".join(self._heading[1]))
+                self._heading = None
+            return
+        # Unclosed elements are implicitly closed by the first matching end tag
+        for depth in range(len(self._stack) - 1, -1, -1):
+            if self._stack[depth][0] == tag:
+                while len(self._stack) > depth:
+                    self._close_cell()
+                return
+        if tag == "div":
+            self._leave_container()
+
+    def handle_data(self, data: str) -> None:
+        if self._stack:
+            self._stack[-1][2].append(data)
+        elif self._heading is not None:
+            self._heading[1].append(data)
+
+    def close(self) -> None:
+        super().close()
+        if self._group is not None:
+            self._leave_container()
+
+    def _enter_container(self, attrs: list[tuple[str, str | None]]) -> None:
+        attributes = dict(attrs)
+        group = attributes.get("data-id")
+        if group is None or attributes.get("id") != f"inf{group}" or group in self.groups:
+            return
+        if self._wanted is not None and group not in self._wanted:
+            return
+        self._group = group
+
+    def _leave_container(self) -> None:
+        while self._stack:
+            self._close_cell()
+        group: str = self._group  # type: ignore[assignment]
+        bounds = [0, *self._boundaries, len(self._tokens)]
+        segments = [
+            cells
+            for start, end in zip(bounds, bounds[1:])
+            if (cells := [token for token in self._tokens[start:end] if token is not None])
+        ]
+        self.groups[group] = split_days(group, segments)
+        self._group = None
+        self._tokens = []
+        self._boundaries = []
+
+    def _close_cell(self) -> None:
+        tag, slot, parts, row = self._stack.pop()
+        if row:
+            self._boundaries.append(len(self._tokens))
+        text = "".join(parts).strip().upper()
+        if text in TOKENS:
+            self._tokens[slot] = text
+        else:
+            self._tokens[slot] = TAG_TOKENS.get(tag)
+
+
+def parse_page(content: str, groups: Collection[str] | None = None) -> ParsedPage:
+    """Return the per-day tokens of every group container on the page.
+
+    Raises PageStructureError when a container does not hold whole days.
+    """
+    parser = GroupTokensParser(groups)
+    parser.feed(content)
+    parser.close()
+    return ParsedPage(parser.groups, parser.first_day)
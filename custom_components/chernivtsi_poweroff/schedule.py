@@ -0,0 +1,188 @@
+"""Compact per-group schedule representation.
+
+A day is stored as two 48-bit integer masks, one bit per half-hour slot: one
+for OFF ("В") and one for POSSIBLE ON ("МЗ"); every other slot is ON ("З").
+State lookups are a couple of bit tests and contiguous runs are extracted with
+shifts instead of scanning token lists. `PowerOffPeriod` objects are only
+built on demand.
+"""
+
+from collections.abc import Sequence
+
+from .const import STATE_OFF, STATE_ON, STATE_POSSIBLE_ON
+from .entities import PowerOffPeriod
+
+SLOTS_PER_DAY = 48
+SLOT_MINUTES = 30
+FULL_MASK = (1 << SLOTS_PER_DAY) - 1
+
+
+def mask_runs(mask: int) -> list[tuple[int, int]]:
+    """Return the [start, end) slot ranges of every run of set bits in mask."""
+    starts = mask & ~(mask << 1)
+    ends = mask & ~(mask >> 1)
+    runs: list[tuple[int, int]] = []
+    while starts:
+        start_bit = starts & -starts
+        end_bit = ends & -ends
+        runs.append((start_bit.bit_length() - 1, end_bit.bit_length()))
+        starts ^= start_bit
+        ends ^= end_bit
+    return runs
+
+
+def longest_run(mask: int) -> int:
+    """Return the length of the longest run of set bits in mask.
+
+    Every `mask & mask >> 1` shortens all runs by one bit, so this loops once
+    per bit of the longest run rather than once per slot.
+    """
+    length = 0
+    while mask:
+        mask &= mask >> 1
+        length += 1
+    return length
+
+
+class DaySchedule:
+    """Half-hour slot states of a single day."""
+
+    __slots__ = ("off", "possible_on")
+
+    def __init__(self, off: int = 0, possible_on: int = 0) -> None:
+        """Initialize the day from its OFF and POSSIBLE ON masks."""
+        self.off = off & FULL_MASK
+        self.possible_on = possible_on & FULL_MASK & ~self.off
+
+    @classmethod
+    def from_tokens(cls, tokens: Sequence[str]) -> "DaySchedule":
+        """Build a day from up to 48 legend tokens."""
+        off = possible_on = 0
+        for slot, token in enumerate(tokens[:SLOTS_PER_DAY]):
+            if token == "В":
+                off |= 1 << slot
+            elif token == "МЗ":
+                possible_on |= 1 << slot
+        return cls(off, possible_on)
+
+    @property
+    def on(self) -> int:
+        """Return the mask of ON slots."""
+        return FULL_MASK & ~(self.off | self.possible_on)
+
+    def state_at(self, slot: int) -> str:
+        """Return the state of a slot (0..47)."""
+        bit = 1 << slot
+        if self.off & bit:
+            return STATE_OFF
+        if self.possible_on & bit:
+            return STATE_POSSIBLE_ON
+        return STATE_ON
+
+    def mask(self, state: str) -> int:
+        """Return the slot mask of a state."""
+        if state == STATE_OFF:
+            return self.off
+        if state == STATE_POSSIBLE_ON:
+            return self.possible_on
+        return self.on
+
+    def runs(self, state: str) -> list[tuple[int, int]]:
+        """Return the [start, end) slot ranges in which the day is in a state."""
+        return mask_runs(self.mask(state))
+
+    def count(self, state: str) -> int:
+        """Return the number of slots in a state."""
+        return self.mask(state).bit_count()
+
+    def longest_run(self, state: str) -> int:
+        """Return the length in slots of the longest run of a state."""
+        return longest_run(self.mask(state))
+
+    def to_tokens(self) -> list[str]:
+        """Return the 48 legend tokens of the day."""
+        return [
+            "В" if self.off >> slot & 1 else "МЗ" if self.possible_on >> slot & 1 else "З"
+            for slot in range(SLOTS_PER_DAY)
+        ]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DaySchedule):
+            return NotImplemented
+        return self.off == other.off and self.possible_on == other.possible_on
+
+    def __hash__(self) -> int:
+        return hash((self.off, self.possible_on))
+
+    def __repr__(self) -> str:
+        return f"DaySchedule(off={self.off:#014x}, possible_on={self.possible_on:#014x})"
+
+
+class GroupSchedule:
+    """Schedule of a group: today first, then tomorrow when published."""
+
+    __slots__ = ("days", "_periods")
+
+    def __init__(self, days: Sequence[DaySchedule] = ()) -> None:
+        """Initialize the schedule."""
+        self.days: tuple[DaySchedule, ...] = tuple(days)
+        self._periods: list[PowerOffPeriod] | None = None
+
+    @classmethod
+    def from_tokens(cls, tokens: Sequence[Sequence[str]]) -> "GroupSchedule":
+        """Build a schedule from per-day legend tokens."""
+        return cls([DaySchedule.from_tokens(day_tokens) for day_tokens in tokens])
+
+    def state_at(self, day: int, slot: int) -> str:
+        """Return the state of a slot; days that are not published are ON."""
+        if day >= len(self.days):
+            return STATE_ON
+        return self.days[day].state_at(slot)
+
+    def changed_slots(self, previous: "GroupSchedule", shift: int = 0) -> list[tuple[int, int]]:
+        """Return the (day, slot) pairs whose state differs from a previous schedule.
+
+        `shift` is the number of days that passed since the previous schedule
+        was parsed; its days before today are ignored. Days that are not
+        published count as ON.
+        """
+        old_days = previous.days[shift:]
+        empty = DaySchedule()
+        changed: list[tuple[int, int]] = []
+        for day_idx in range(max(len(self.days), len(old_days))):
+            new = self.days[day_idx] if day_idx < len(self.days) else empty
+            old = old_days[day_idx] if day_idx < len(old_days) else empty
+            mask = (new.off ^ old.off) | (new.possible_on ^ old.possible_on)
+            while mask:
+                bit = mask & -mask
+                changed.append((day_idx, bit.bit_length() - 1))
+                mask ^= bit
+        return changed
+
+    @property
+    def periods(self) -> list[PowerOffPeriod]:
+        """Return OFF and POSSIBLE ON periods, built on first access.
+
+        The list is shared between callers and must not be mutated.
+        """
+        if self._periods is None:
+            periods: list[PowerOffPeriod] = []
+            for day_idx, day in enumerate(self.days):
+                for state in (STATE_OFF, STATE_POSSIBLE_ON):
+                    periods += [
+                        PowerOffPeriod(start * SLOT_MINUTES, end * SLOT_MINUTES, today=(day_idx == 0), state=state)
+                        for start, end in day.runs(state)
+                    ]
+            self._periods = periods
+        return self._periods
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GroupSchedule):
+            return NotImplemented
+        return self.days == other.days
+
+    def __hash__(self) -> int:
+        return hash(self.days)
+
+    def __repr__(self) -> str:
+        return f"GroupSchedule({list(self.days)!r})"
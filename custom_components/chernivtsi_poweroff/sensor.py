@@ -7,12 +7,15 @@ from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
+    SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfInformation, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .aggregate import ChernivtsiPowerOffGroups
 from .const import STATE_OFF, STATE_ON, STATE_POSSIBLE_ON
 from .coordinator import ChernivtsiPowerOffCoordinator
 
@@ -24,6 +27,10 @@ class ChernivtsiPowerOffSensorDescription(SensorEntityDescription):
     """Chernivtsi PowerOff entity description."""
 
     val_func: Callable[[ChernivtsiPowerOffCoordinator], Any]
+    # Debug sensors read the shared pipeline metrics and switch their timings on
+    debug: bool = False
+    # Written after every refresh instead of only when the schedule changed
+    every_refresh: bool = False
 
 
 SENSOR_TYPES: tuple[ChernivtsiPowerOffSensorDescription, ...] = (
@@ -55,6 +62,184 @@ SENSOR_TYPES: tuple[ChernivtsiPowerOffSensorDescription, ...] = (
         device_class=SensorDeviceClass.TIMESTAMP,
         name="Last update",
         val_func=lambda coordinator: coordinator.last_update_time,
+        every_refresh=True,
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="off_hours_today",
+        icon="mdi:timer-off-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        name="Hours without power today",
+        val_func=lambda coordinator: coordinator.outage_stats["off_hours_today"],
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="off_hours_tomorrow",
+        icon="mdi:timer-off-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        name="Hours without power tomorrow",
+        val_func=lambda coordinator: coordinator.outage_stats["off_hours_tomorrow"],
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="off_hours_week",
+        icon="mdi:calendar-week",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        name="Hours without power this week",
+        val_func=lambda coordinator: coordinator.outage_stats["off_hours_week"],
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="longest_outage_today",
+        icon="mdi:timer-alert-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        name="Longest outage today",
+        val_func=lambda coordinator: coordinator.outage_stats["longest_outage_today"],
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="possible_on_share_today",
+        icon="mdi:percent-outline",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        name="Possible on share today",
+        val_func=lambda coordinator: coordinator.outage_stats["possible_on_share_today"],
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="off_hours_7d",
+        icon="mdi:chart-bar",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        name="Hours without power in 7 days",
+        val_func=lambda coordinator: coordinator.outage_stats["off_hours_7d"],
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="off_hours_30d",
+        icon="mdi:chart-bar",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        name="Hours without power in 30 days",
+        val_func=lambda coordinator: coordinator.outage_stats["off_hours_30d"],
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="refresh_interval",
+        icon="mdi:timer-sync-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        name="Refresh interval",
+        val_func=lambda coordinator: coordinator.update_interval.total_seconds(),
+        every_refresh=True,
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="next_refresh",
+        icon="mdi:clock-fast",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        name="Next refresh",
+        val_func=lambda coordinator: coordinator.next_refresh,
+        every_refresh=True,
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="fetch_time",
+        icon="mdi:download-network-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        name="Fetch time",
+        val_func=lambda coordinator: coordinator.hub.metrics.last_ms("fetch"),
+        debug=True,
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="parse_time",
+        icon="mdi:file-code-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        name="Parse time",
+        val_func=lambda coordinator: coordinator.hub.metrics.last_ms("parse_job"),
+        debug=True,
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="index_build_time",
+        icon="mdi:sort-clock-ascending-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        name="Index build time",
+        val_func=lambda coordinator: coordinator.hub.metrics.last_ms("index_build"),
+        debug=True,
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="bytes_downloaded",
+        icon="mdi:download",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        name="Bytes downloaded",
+        val_func=lambda coordinator: coordinator.hub.metrics.counters["bytes_downloaded"],
+        debug=True,
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="page_cache_hits",
+        icon="mdi:cached",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        name="Page cache hits",
+        val_func=lambda coordinator: coordinator.hub.metrics.counters["cache_hits"],
+        debug=True,
+    ),
+    ChernivtsiPowerOffSensorDescription(
+        key="not_modified_responses",
+        icon="mdi:sync-off",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        name="Not modified responses",
+        val_func=lambda coordinator: coordinator.hub.metrics.counters["not_modified"],
+        debug=True,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class ChernivtsiPowerOffGroupsSensorDescription(SensorEntityDescription):
+    """Chernivtsi PowerOff description of an entity that covers all groups of an entry."""
+
+    val_func: Callable[[ChernivtsiPowerOffGroups], Any]
+    attrs_func: Callable[[ChernivtsiPowerOffGroups], dict[str, Any]] | None = None
+
+
+GROUPS_SENSOR_TYPES: tuple[ChernivtsiPowerOffGroupsSensorDescription, ...] = (
+    ChernivtsiPowerOffGroupsSensorDescription(
+        key="groups_electricity",
+        icon="mdi:transmission-tower",
+        device_class=SensorDeviceClass.ENUM,
+        name="Power state of any group",
+        options=[STATE_ON, STATE_OFF, STATE_POSSIBLE_ON],
+        val_func=lambda groups: groups.current_state,
+        attrs_func=lambda groups: {"off_groups": [str(group) for group in groups.off_groups]},
+    ),
+    ChernivtsiPowerOffGroupsSensorDescription(
+        key="groups_next_poweroff",
+        icon="mdi:calendar-remove",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        name="Earliest next power off",
+        val_func=lambda groups: groups.next_poweroff,
     ),
 )
 
@@ -66,26 +251,86 @@ async def async_setup_entry(
 ) -> None:
     """Set up the Chernivtsi PowerOff sensors."""
     LOGGER.debug("Setup new entry: %s", config_entry)
-    coordinator: ChernivtsiPowerOffCoordinator = config_entry.runtime_data
-    async_add_entities(ChernivtsiPowerOffSensor(coordinator, description) for description in SENSOR_TYPES)
+    groups: ChernivtsiPowerOffGroups = config_entry.runtime_data
+    entities: list[SensorEntity] = [
+        ChernivtsiPowerOffSensor(coordinator, description, extra_group=coordinator is not groups.primary)
+        for coordinator in groups.coordinators
+        for description in SENSOR_TYPES
+        # The pipeline metrics are shared, their sensors belong to the main group only
+        if coordinator is groups.primary or not description.debug
+    ]
+    if len(groups.coordinators) > 1:
+        entities += [ChernivtsiPowerOffGroupsSensor(groups, description) for description in GROUPS_SENSOR_TYPES]
+    async_add_entities(entities)
 
 
 class ChernivtsiPowerOffSensor(CoordinatorEntity[ChernivtsiPowerOffCoordinator], SensorEntity):
     """Sensor entity that uses coordinator for automatic updates."""
-    
+
     def __init__(
         self,
         coordinator: ChernivtsiPowerOffCoordinator,
         entity_description: ChernivtsiPowerOffSensorDescription,
+        extra_group: bool = False,
     ) -> None:
-        """Initialize the sensor."""
+        """Initialize the sensor.
+
+        Sensors of the entry's extra groups carry the group in their id and name.
+        """
         super().__init__(coordinator)
         self.entity_description = entity_description
-        self._attr_unique_id = (
-            f"{coordinator.config_entry.entry_id}-{self.entity_description.key}"
-        )
+        if extra_group:
+            self._attr_unique_id = f"{coordinator.config_entry.entry_id}-{coordinator.group}-{entity_description.key}"
+            self._attr_name = f"{entity_description.name} (group {coordinator.group})"
+        else:
+            self._attr_unique_id = f"{coordinator.config_entry.entry_id}-{entity_description.key}"
+
+    async def async_added_to_hass(self) -> None:
+        """Switch the pipeline timings on while a debug sensor is enabled.
+
+        Sensors of the refresh itself and of the pipeline metrics are written
+        after every refresh, the others only when the schedule changed.
+        """
+        await super().async_added_to_hass()
+        if self.entity_description.debug:
+            self.async_on_remove(self.coordinator.hub.metrics.enable())
+        if self.entity_description.every_refresh or self.entity_description.debug:
+            self.async_on_remove(self.coordinator.async_add_refresh_listener(self.async_write_ha_state))
 
     @property
     def native_value(self) -> str | None:
         """Return the state of the sensor."""
         return self.entity_description.val_func(self.coordinator)  # type: ignore
+
+
+class ChernivtsiPowerOffGroupsSensor(SensorEntity):
+    """Sensor entity that follows every group of an entry."""
+
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        groups: ChernivtsiPowerOffGroups,
+        entity_description: ChernivtsiPowerOffGroupsSensorDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.groups = groups
+        self.entity_description = entity_description
+        self._attr_unique_id = f"{groups.primary.config_entry.entry_id}-{entity_description.key}"
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state whenever any group is updated."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.groups.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> Any:
+        """Return the state of the sensor."""
+        return self.entity_description.val_func(self.groups)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the per-group details of the sensor."""
+        if self.entity_description.attrs_func is None:
+            return None
+        return self.entity_description.attrs_func(self.groups)
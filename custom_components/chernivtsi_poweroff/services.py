@@ -0,0 +1,65 @@
+"""Services of the Chernivtsi Power Offline integration."""
+
+from __future__ import annotations
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.helpers import config_validation as cv
+
+from .const import DOMAIN, STATE_OFF, STATE_POSSIBLE_ON, PowerOffGroup
+from .hub import async_get_hub
+from .schedule import SLOT_MINUTES
+
+SERVICE_GET_HISTORY = "get_history"
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+ATTR_GROUP = "group"
+
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_START_DATE): cv.date,
+        vol.Required(ATTR_END_DATE): cv.date,
+        vol.Optional(ATTR_GROUP): vol.Coerce(PowerOffGroup),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services (once for all entries)."""
+    if hass.services.has_service(DOMAIN, SERVICE_GET_HISTORY):
+        return
+
+    async def async_get_history(call: ServiceCall) -> ServiceResponse:
+        """Return the archived OFF and POSSIBLE ON periods (in minutes of the day) of past days."""
+        days = async_get_hub(hass).archive.query(
+            call.data[ATTR_START_DATE], call.data[ATTR_END_DATE], call.data.get(ATTR_GROUP)
+        )
+        return {
+            "days": [
+                {
+                    "date": day.isoformat(),
+                    "group": group,
+                    "off": [[start * SLOT_MINUTES, end * SLOT_MINUTES] for start, end in schedule.runs(STATE_OFF)],
+                    "possible_on": [
+                        [start * SLOT_MINUTES, end * SLOT_MINUTES] for start, end in schedule.runs(STATE_POSSIBLE_ON)
+                    ],
+                }
+                for day, group, schedule in days
+            ]
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        async_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+@callback
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the integration's services."""
+    hass.services.async_remove(DOMAIN, SERVICE_GET_HISTORY)
@@ -0,0 +1,104 @@
+"""Compact binary snapshot of the parsed schedules of every group.
+
+One instance scrapes the shutdowns page and serves the snapshot over HTTP,
+others import it without any HTML parsing. Layout (little endian):
+
+    header: magic "CVPO" | uint8 version | int64 fetched at (unix seconds)
+            | uint32 date ordinal of the first day | 16 bytes page hash
+            | uint8 group count
+    group:  uint8 group | uint8 day count
+            | per day: 6 bytes OFF mask, 6 bytes POSSIBLE ON mask
+
+Twelve groups of two days take 346 bytes.
+"""
+
+from datetime import UTC, date, datetime
+import struct
+from typing import NamedTuple
+
+from .schedule import DaySchedule, GroupSchedule
+
+MAGIC = b"CVPO"
+VERSION = 1
+HEADER = struct.Struct("<4sBqI16sB")
+GROUP = struct.Struct("<BB")
+MASK_BYTES = 6
+CONTENT_TYPE = "application/vnd.chernivtsi-poweroff.snapshot"
+
+
+class SnapshotError(ValueError):
+    """The data is not a snapshot this version can read."""
+
+
+class Snapshot(NamedTuple):
+    """Schedules of every group as of a page fetch."""
+
+    schedules: dict[str, GroupSchedule]
+    first_day: date
+    fetched_at: datetime
+    content_hash: str | None
+
+
+def encode_snapshot(snapshot: Snapshot) -> bytes:
+    """Pack a snapshot."""
+    parts = [
+        HEADER.pack(
+            MAGIC,
+            VERSION,
+            int(snapshot.fetched_at.timestamp()),
+            snapshot.first_day.toordinal(),
+            bytes.fromhex(snapshot.content_hash) if snapshot.content_hash else bytes(16),
+            len(snapshot.schedules),
+        )
+    ]
+    for group, schedule in sorted(snapshot.schedules.items(), key=lambda item: int(item[0])):
+        parts.append(GROUP.pack(int(group), len(schedule.days)))
+        for day in schedule.days:
+            parts.append(day.off.to_bytes(MASK_BYTES, "little") + day.possible_on.to_bytes(MASK_BYTES, "little"))
+    return b"".join(parts)
+
+
+def decode_snapshot(data: bytes) -> Snapshot:
+    """Unpack a snapshot, raising SnapshotError when it is malformed."""
+    if len(data) < HEADER.size:
+        msg = f"Snapshot of {len(data)} bytes is shorter than its header"
+        raise SnapshotError(msg)
+    magic, version, fetched_at, first_day, content_hash, groups = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        msg = "Not a schedule snapshot"
+        raise SnapshotError(msg)
+    if version != VERSION:
+        msg = f"Unsupported snapshot version {version}"
+        raise SnapshotError(msg)
+    schedules: dict[str, GroupSchedule] = {}
+    offset = HEADER.size
+    try:
+        for _ in range(groups):
+            group, days = GROUP.unpack_from(data, offset)
+            offset += GROUP.size
+            end = offset + days * 2 * MASK_BYTES
+            if end > len(data):
+                msg = "Truncated snapshot"
+                raise SnapshotError(msg)
+            schedules[str(group)] = GroupSchedule(
+                [
+                    DaySchedule(
+                        int.from_bytes(data[start : start + MASK_BYTES], "little"),
+                        int.from_bytes(data[start + MASK_BYTES : start + 2 * MASK_BYTES], "little"),
+                    )
+                    for start in range(offset, end, 2 * MASK_BYTES)
+                ]
+            )
+            offset = end
+    except struct.error as err:
+        msg = "Truncated snapshot"
+        raise SnapshotError(msg) from err
+    if offset != len(data):
+        msg = f"{len(data) - offset} trailing bytes after the snapshot"
+        raise SnapshotError(msg)
+    return Snapshot(
+        schedules,
+        date.fromordinal(first_day),
+        datetime.fromtimestamp(fetched_at, UTC),
+        content_hash.hex() if any(content_hash) else None,
+    )
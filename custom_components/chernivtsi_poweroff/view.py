@@ -0,0 +1,30 @@
+"""HTTP view publishing the schedule snapshot to other instances."""
+
+import hashlib
+from http import HTTPStatus
+
+from aiohttp import web
+
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+
+from .const import DOMAIN, SNAPSHOT_PATH
+from .snapshot import CONTENT_TYPE
+
+
+class ChernivtsiPowerOffSnapshotView(HomeAssistantView):
+    """Serve the parsed schedules of every group as a binary snapshot."""
+
+    url = SNAPSHOT_PATH
+    name = f"api:{DOMAIN}:snapshot"
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the snapshot, or 304 when the client already has it."""
+        hub = request.app[KEY_HASS].data.get(DOMAIN)
+        data = hub.snapshot() if hub is not None else None
+        if data is None:
+            return self.json_message("No schedules yet", HTTPStatus.NOT_FOUND)
+        etag = f'"{hashlib.blake2b(data, digest_size=8).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+        return web.Response(body=data, content_type=CONTENT_TYPE, headers=headers)
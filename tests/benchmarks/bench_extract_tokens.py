@@ -0,0 +1,64 @@
+"""Microbenchmark of `EnergyUaScrapper._extract_tokens` against the former quadratic walk.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_extract_tokens
+"""
+
+import timeit
+
+from bs4 import BeautifulSoup
+
+from custom_components.chernivtsi_poweroff.energyua_scrapper import EnergyUaScrapper
+
+
+def legacy_extract_tokens(container) -> list[list[str]]:
+    """Previous implementation: `get_text` per descendant and repeated list slicing."""
+    raw = []
+    for el in container.find_all(True):
+        text = (el.get_text(strip=True) or "").upper()
+        if text not in {"В", "З", "МЗ"}:
+            tag = el.name.lower() if hasattr(el, "name") and el.name else ""
+            if tag == "u":
+                text = "З"
+            elif tag == "s":
+                text = "МЗ"
+            elif tag == "o":
+                text = "В"
+        if text in {"В", "З", "МЗ"}:
+            raw.append(text)
+    days: list[list[str]] = []
+    while raw:
+        days.append(raw[:48])
+        raw = raw[48:]
+        if len(days[-1]) < 48:
+            days[-1] += ["З"] * (48 - len(days[-1]))
+        if len(days) == 2:
+            break
+    if not days:
+        days = [["З"] * 48]
+    return days
+
+
+def build_container(depth: int):
+    """Group container whose 96 cells sit below `depth` layout wrappers."""
+    cells = "".join("<o>в</o>" if slot % 6 == 0 else "<u>з</u>" for slot in range(96))
+    html = "<div id='inf1' data-id='1'>" + "<div>" * depth + cells + "</div>" * depth + "</div>"
+    return BeautifulSoup(html, "html.parser").select_one("div#inf1")
+
+
+def main() -> None:
+    scrapper = EnergyUaScrapper()
+    for depth in (0, 10, 50, 200):
+        container = build_container(depth)
+        assert scrapper._extract_tokens(container) == legacy_extract_tokens(container)
+        number = 20
+        new = timeit.timeit(lambda: scrapper._extract_tokens(container), number=number) / number
+        old = timeit.timeit(lambda: legacy_extract_tokens(container), number=number) / number
+        print(
+            f"depth={depth:4d}  legacy={old * 1e3:8.3f} ms  single-pass={new * 1e3:7.3f} ms  speedup={old / new:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
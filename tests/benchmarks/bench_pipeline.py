@@ -0,0 +1,164 @@
+"""Benchmarks of the scrape -> parse -> query pipeline on synthetic pages.
+
+Pages are generated with any number of group containers and days, the fetch
+is served by aioresponses, so no network is involved. Run from the
+repository root:
+
+    python -m tests.benchmarks.bench_pipeline            # compare with the baseline
+    python -m tests.benchmarks.bench_pipeline --save     # record a new baseline
+
+Timings are compared with `baseline.json` next to this file and the run
+exits with status 1 when a benchmark is slower than `--tolerance` times its
+baseline. Baselines are machine specific: record them on the machine (or CI
+runner class) that checks them. The test suite runs the machine-independent
+checks of tests/test_performance.py instead, which compare benchmarks with
+each other.
+"""
+
+import argparse
+import asyncio
+from collections.abc import Callable
+from datetime import timedelta
+import json
+from pathlib import Path
+import sys
+import tempfile
+import timeit
+
+from aioresponses import aioresponses
+from bs4 import BeautifulSoup
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.chernivtsi_poweroff.const import DOMAIN, POWEROFF_GROUP_CONF
+from custom_components.chernivtsi_poweroff.coordinator import ChernivtsiPowerOffCoordinator
+from custom_components.chernivtsi_poweroff.energyua_scrapper import URL, PARSER_BS4, PARSER_FAST, EnergyUaScrapper
+from custom_components.chernivtsi_poweroff.entities import PowerOffPeriod
+from custom_components.chernivtsi_poweroff.hub import ChernivtsiPowerOffHub
+from custom_components.chernivtsi_poweroff.schedule import GroupSchedule
+from tests.fake_oblenergo import random_schedules, render_page
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def random_tokens(days: int, seed: int) -> list[list[str]]:
+    """Return per-day tokens of a single group with outage runs of random length."""
+    return random_schedules(groups=1, days=days, seed=seed)["1"]
+
+
+def build_page(groups: int, days: int, seed: int = 0) -> str:
+    """Return a shutdowns page with `groups` containers of `days` days each, wrapped in layout markup."""
+    return render_page(random_schedules(groups, days, seed), rows=True)
+
+
+def measure(func: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """Return the best time of a call in seconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def bench_parsing(results: dict[str, float]) -> None:
+    for groups in (12, 120):
+        page = build_page(groups, days=2)
+        fast = EnergyUaScrapper(parser=PARSER_FAST)
+        bs4 = EnergyUaScrapper(parser=PARSER_BS4)
+        assert fast.parse_groups(page) == bs4.parse_groups(page)
+        results[f"parse_page_fast[groups={groups}]"] = measure(lambda: fast.parse_groups(page), number=5)
+        results[f"parse_page_bs4[groups={groups}]"] = measure(lambda: bs4.parse_groups(page), number=2)
+
+    container = BeautifulSoup(build_page(1, days=2), "html.parser").select_one("div#inf1")
+    scrapper = EnergyUaScrapper()
+    results["extract_tokens"] = measure(lambda: scrapper._extract_tokens(container), number=200)
+
+    day = random_tokens(days=1, seed=1)[0]
+    results["tokens_to_periods"] = measure(lambda: scrapper._tokens_to_periods(day, target="В"), number=2000)
+
+    periods = [
+        PowerOffPeriod(period.start, period.end, today=True, state=period.state)
+        for seed in range(12)
+        for period in GroupSchedule.from_tokens(random_tokens(days=1, seed=seed)).periods
+    ]
+    results["merge_periods[12 groups]"] = measure(
+        lambda: EnergyUaScrapper.merge_periods([PowerOffPeriod(p.start, p.end, p.today, p.state) for p in periods]),
+        number=200,
+    )
+
+
+async def bench_hub_and_coordinator(results: dict[str, float]) -> None:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            hub = ChernivtsiPowerOffHub(hass)
+            page = build_page(120, days=2)
+            with aioresponses() as mock:
+                mock.get(URL, body=page, repeat=True)
+                await hub.async_refresh()
+                number = 5
+                start = asyncio.get_running_loop().time()
+                for _ in range(number):
+                    # Forget the page hash so that every fetch is parsed again
+                    hub.content_hash = None
+                    await hub.async_refresh()
+                results["fetch_and_parse[groups=120]"] = (asyncio.get_running_loop().time() - start) / number
+
+            entry = ConfigEntry(
+                data={POWEROFF_GROUP_CONF: "1"},
+                domain=DOMAIN,
+                minor_version=1,
+                options={},
+                source="user",
+                title="Benchmark",
+                unique_id=None,
+                version=1,
+            )
+            coordinator = ChernivtsiPowerOffCoordinator(hass, entry)
+
+            def rebuild_index() -> None:
+                coordinator._index_day_start = None
+                coordinator._ensure_index()
+
+            for days in (2, 30):
+                coordinator.schedule = GroupSchedule.from_tokens(random_tokens(days, seed=days))
+                results[f"build_index[days={days}]"] = measure(rebuild_index, number=50)
+                now = dt_util.now()
+                results[f"current_state[days={days}]"] = measure(lambda: coordinator.current_state, number=2000)
+                results[f"next_poweroff[days={days}]"] = measure(lambda: coordinator.next_poweroff, number=2000)
+                results[f"get_events_between_month[days={days}]"] = measure(
+                    lambda: coordinator.get_events_between(now - timedelta(days=30), now + timedelta(days=30)),
+                    number=500,
+                )
+            await hub.async_close()
+        finally:
+            await hass.async_stop(force=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", action="store_true", help="record the timings as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown factor (default 1.5)")
+    args = parser.parse_args()
+
+    results: dict[str, float] = {}
+    bench_parsing(results)
+    asyncio.run(bench_hub_and_coordinator(results))
+
+    baseline: dict[str, float] = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    regressions = []
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        ratio = f"{seconds / reference:5.2f}x" if reference else "    -"
+        print(f"{name:42s} {seconds * 1e6:12.1f} us  {ratio}")
+        if reference and not args.save and seconds > reference * args.tolerance:
+            regressions.append(name)
+
+    if args.save:
+        BASELINE.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {BASELINE}")
+    elif regressions:
+        print(f"Slower than {args.tolerance}x the baseline: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
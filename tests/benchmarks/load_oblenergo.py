@@ -0,0 +1,108 @@
+"""Load test: N coordinators refreshing concurrently against the fake oblenergo server.
+
+Every round expires the shared page and refreshes all coordinators at once,
+every `--change-every` rounds the server publishes a new schedule. Reports
+the requests the server saw, the p50/p99 refresh latency and the longest
+event loop stall. Run from the repository root:
+
+    python -m tests.benchmarks.load_oblenergo --coordinators 50 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.chernivtsi_poweroff.const import DOMAIN, POWEROFF_GROUP_CONF, PowerOffGroup
+from custom_components.chernivtsi_poweroff.coordinator import ChernivtsiPowerOffCoordinator
+from custom_components.chernivtsi_poweroff.hub import ChernivtsiPowerOffHub
+from tests.fake_oblenergo import FakeOblenergo, random_schedules
+
+
+async def watch_loop(stalls: list[float], interval: float = 0.001) -> None:
+    """Record how late the event loop wakes up from short sleeps."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - start - interval)
+
+
+def percentile(values: list[float], share: float) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[round(share * 100) - 1]
+
+
+async def run(args: argparse.Namespace) -> None:
+    server = FakeOblenergo(random_schedules(args.groups), latency=args.latency)
+    await server.start()
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            hub = hass.data[DOMAIN] = ChernivtsiPowerOffHub(hass, url=server.url)
+            groups = [group for group in PowerOffGroup if int(group) <= args.groups]
+            coordinators = [
+                ChernivtsiPowerOffCoordinator(
+                    hass,
+                    ConfigEntry(
+                        data={POWEROFF_GROUP_CONF: groups[index % len(groups)]},
+                        domain=DOMAIN,
+                        minor_version=1,
+                        options={},
+                        source="user",
+                        title=f"Load {index}",
+                        unique_id=None,
+                        version=1,
+                    ),
+                )
+                for index in range(args.coordinators)
+            ]
+
+            async def timed_refresh(coordinator: ChernivtsiPowerOffCoordinator) -> float:
+                start = time.perf_counter()
+                await coordinator.async_refresh()
+                return time.perf_counter() - start
+
+            stalls: list[float] = []
+            watcher = asyncio.create_task(watch_loop(stalls))
+            latencies: list[float] = []
+            for round_ in range(args.rounds):
+                if round_ and round_ % args.change_every == 0:
+                    server.set_schedules(random_schedules(args.groups, seed=round_))
+                # Expire the shared page so that the round goes to the server
+                hub._fetched_at = None
+                latencies += await asyncio.gather(*(timed_refresh(coordinator) for coordinator in coordinators))
+            watcher.cancel()
+
+            for coordinator in coordinators:
+                await coordinator.async_shutdown()
+            await hub.async_close()
+        finally:
+            await hass.async_stop(force=True)
+    await server.close()
+
+    failed = sum(not coordinator.last_update_success for coordinator in coordinators)
+    print(f"coordinators x rounds    {args.coordinators} x {args.rounds} ({failed} failing at the end)")
+    print(f"server requests          {server.stats['requests']} ({server.stats['not_modified']} not modified)")
+    print(f"hub counters             {dict(hub.metrics.counters)}")
+    print(f"refresh latency p50      {percentile(latencies, 0.5) * 1000:8.1f} ms")
+    print(f"refresh latency p99      {percentile(latencies, 0.99) * 1000:8.1f} ms")
+    print(f"longest loop stall       {max(stalls, default=0.0) * 1000:8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coordinators", type=int, default=24, help="concurrent coordinators (default 24)")
+    parser.add_argument("--groups", type=int, default=12, help="groups on the page (default 12)")
+    parser.add_argument("--rounds", type=int, default=20, help="refresh rounds (default 20)")
+    parser.add_argument("--change-every", type=int, default=5, help="rounds between schedule changes (default 5)")
+    parser.add_argument("--latency", type=float, default=0.05, help="server latency in seconds (default 0.05)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
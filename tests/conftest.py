@@ -0,0 +1,39 @@
+from collections.abc import AsyncGenerator, Callable
+
+import pytest
+import pytest_asyncio
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.chernivtsi_poweroff.const import DOMAIN
+from tests.fake_oblenergo import FakeOblenergo
+
+
+@pytest_asyncio.fixture
+async def hass(tmp_path) -> AsyncGenerator[HomeAssistant, None]:
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+@pytest_asyncio.fixture
+async def fake_oblenergo() -> AsyncGenerator[FakeOblenergo, None]:
+    server = FakeOblenergo()
+    await server.start()
+    yield server
+    await server.close()
+
+
+@pytest.fixture
+def make_config_entry() -> Callable[..., ConfigEntry]:
+    return lambda **data: ConfigEntry(
+        data=data,
+        domain=DOMAIN,
+        minor_version=1,
+        options={},
+        source="user",
+        title="Chernivtsi Power Offline",
+        unique_id=None,
+        version=1,
+    )
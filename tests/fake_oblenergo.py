@@ -0,0 +1,134 @@
+"""Local stand-in for the oblenergo shutdowns page.
+
+`FakeOblenergo` is an aiohttp server that renders generated schedules in the
+structure of `oblenergo_test.html` (one `div#inf{group}` per group with a
+`<u>з</u>` / `<s>мз</s>` / `<o>в</o>` cell per half-hour slot). It can add
+latency, answer conditional requests with 304, fail with bursts of 5xx and
+serve truncated pages, and it counts what it served. Point a hub or a
+scrapper at `server.url` to use it.
+"""
+
+import asyncio
+from collections import Counter
+from datetime import date
+import hashlib
+import random
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.chernivtsi_poweroff.schedule import SLOTS_PER_DAY
+
+CELLS = {"В": "<o>в</o>", "З": "<u>з</u>", "МЗ": "<s>мз</s>"}
+PATH = "/shutdowns/"
+
+
+def random_schedules(groups: int = 12, days: int = 2, seed: int = 0) -> dict[str, list[list[str]]]:
+    """Return per-day tokens of groups 1..groups with outage runs of random length."""
+    rng = random.Random(seed)
+    schedules: dict[str, list[list[str]]] = {}
+    for group in range(1, groups + 1):
+        schedules[str(group)] = []
+        for _ in range(days):
+            day: list[str] = []
+            while len(day) < SLOTS_PER_DAY:
+                day += [rng.choice(list(CELLS))] * rng.randint(1, 8)
+            schedules[str(group)].append(day[:SLOTS_PER_DAY])
+    return schedules
+
+
+def render_page(schedules: dict[str, list[list[str]]], first_day: date | None = None, rows: bool = False) -> str:
+    """Render a shutdowns page listing the given groups, headed by the date of the first day if given.
+
+    With `rows` every container wraps its days in layout markup, one `<tr>` of
+    `<td>` cells per day.
+    """
+    header = f"<h2>Графік погодинних відключень на {first_day:%d.%m.%Y}</h2>" if first_day else ""
+    if rows:
+        containers = "".join(
+            f'<div><div id="inf{group}" data-id="{group}"><table>'
+            + "".join("<tr>" + "".join(f"<td>{CELLS[token]}</td>" for token in day) + "</tr>" for day in days)
+            + "</table></div></div>"
+            for group, days in schedules.items()
+        )
+    else:
+        containers = "".join(
+            f'<div id="inf{group}" data-id="{group}">'
+            + "".join(CELLS[token] for day in days for token in day)
+            + "</div>"
+            for group, days in schedules.items()
+        )
+    return (
+        '<!DOCTYPE html><html lang="uk"><head><meta charset="utf-8"><title>Shutdowns</title></head>'
+        f"<body>{header}{containers}</body></html>"
+    )
+
+
+class FakeOblenergo:
+    """Serve generated shutdowns pages with configurable faults."""
+
+    def __init__(
+        self,
+        schedules: dict[str, list[list[str]]] | None = None,
+        latency: float = 0.0,
+        etag: bool = True,
+    ) -> None:
+        """Initialize the server with the schedules to serve (12 random groups by default)."""
+        self.latency = latency
+        self.etag = etag
+        # Number of upcoming requests answered with `fail_status` / a truncated page
+        self.fail_next = 0
+        self.fail_status = 503
+        self.truncate_next = 0
+        self.stats: Counter[str] = Counter()
+        self._server = TestServer(web.Application())
+        self._server.app.router.add_get(PATH, self._handle)
+        self.set_schedules(schedules or random_schedules())
+
+    @property
+    def url(self) -> str:
+        """Get the URL of the shutdowns page."""
+        return str(self._server.make_url(PATH))
+
+    def set_schedules(self, schedules: dict[str, list[list[str]]], first_day: date | None = None) -> None:
+        """Publish new schedules, changing the ETag."""
+        self.schedules = schedules
+        self.html = render_page(schedules, first_day)
+        self.page = self.html.encode()
+        self.page_etag = '"' + hashlib.blake2b(self.page, digest_size=8).hexdigest() + '"'
+
+    def fail(self, count: int, status: int = 503) -> None:
+        """Answer the next `count` requests with an error status."""
+        self.fail_next, self.fail_status = count, status
+
+    def truncate(self, count: int) -> None:
+        """Serve only the first half of the page to the next `count` requests."""
+        self.truncate_next = count
+
+    async def start(self) -> None:
+        """Start listening on a free local port."""
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        """Stop the server."""
+        await self._server.close()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.stats["requests"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_next:
+            self.fail_next -= 1
+            self.stats["failed"] += 1
+            return web.Response(status=self.fail_status, text="<html><body>Service Unavailable</body></html>")
+        headers = {"ETag": self.page_etag} if self.etag else {}
+        if self.etag and request.headers.get("If-None-Match") == self.page_etag:
+            self.stats["not_modified"] += 1
+            return web.Response(status=304, headers=headers)
+        body = self.page
+        if self.truncate_next:
+            self.truncate_next -= 1
+            self.stats["truncated"] += 1
+            body = self.html[: len(self.html) // 2].encode()
+        self.stats["pages"] += 1
+        return web.Response(body=body, content_type="text/html", charset="utf-8", headers=headers)
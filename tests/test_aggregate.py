@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.chernivtsi_poweroff.aggregate import ChernivtsiPowerOffGroups
+from custom_components.chernivtsi_poweroff.const import (
+    EXTRA_GROUPS_CONF,
+    POWEROFF_GROUP_CONF,
+    STATE_OFF,
+    STATE_ON,
+    STATE_POSSIBLE_ON,
+    PowerOffGroup,
+    entry_groups,
+)
+from custom_components.chernivtsi_poweroff.coordinator import ChernivtsiPowerOffCoordinator
+from custom_components.chernivtsi_poweroff.diagnostics import async_get_config_entry_diagnostics
+from custom_components.chernivtsi_poweroff.schedule import DaySchedule, GroupSchedule
+
+TZ = ZoneInfo("Europe/Kyiv")
+
+# Home: OFF 05:00-07:00; office: OFF 06:00-09:00, POSSIBLE ON 12:00-13:00; flat: always ON
+HOME = ["З"] * 10 + ["В"] * 4 + ["З"] * 34
+OFFICE = ["З"] * 12 + ["В"] * 6 + ["З"] * 6 + ["МЗ"] * 2 + ["З"] * 22
+FLAT = ["З"] * 48
+
+
+@pytest.fixture
+def groups(hass, make_config_entry, monkeypatch):
+    monkeypatch.setattr(dt_util, "DEFAULT_TIME_ZONE", TZ)
+    entry = make_config_entry(**{POWEROFF_GROUP_CONF: PowerOffGroup.Two, EXTRA_GROUPS_CONF: ["5", "9"]})
+    coordinators = [ChernivtsiPowerOffCoordinator(hass, entry, group) for group in entry_groups(entry.data)]
+    for coordinator, tokens in zip(coordinators, (HOME, OFFICE, FLAT)):
+        coordinator.schedule = GroupSchedule.from_tokens([tokens])
+    return ChernivtsiPowerOffGroups(coordinators)
+
+
+def at(monkeypatch, hour: int, minute: int = 0) -> datetime:
+    now = datetime(2026, 10, 17, hour, minute, tzinfo=TZ)
+    monkeypatch.setattr(dt_util, "now", lambda time_zone=None: now.astimezone(time_zone or TZ))
+    return now
+
+
+def test_entry_groups():
+    assert entry_groups({POWEROFF_GROUP_CONF: "2"}) == [PowerOffGroup.Two]
+    assert entry_groups({POWEROFF_GROUP_CONF: "2", EXTRA_GROUPS_CONF: ["5", "2", "9"]}) == [
+        PowerOffGroup.Two,
+        PowerOffGroup.Five,
+        PowerOffGroup.Nine,
+    ]
+
+
+def test_aggregate_state_and_next_poweroff(groups, monkeypatch):
+    assert groups.primary.group == PowerOffGroup.Two
+
+    now = at(monkeypatch, 4)
+    assert groups.current_state == STATE_ON
+    assert groups.next_poweroff == now.replace(hour=5)
+
+    at(monkeypatch, 6, 30)
+    assert groups.current_state == STATE_OFF
+    assert groups.off_groups == [PowerOffGroup.Two, PowerOffGroup.Five]
+
+    now = at(monkeypatch, 12, 30)
+    assert groups.current_state == STATE_POSSIBLE_ON
+    assert groups.off_groups == []
+    assert groups.next_poweroff is None
+
+
+def test_merged_calendar(groups, monkeypatch):
+    now = at(monkeypatch, 4)
+    events = groups.get_events_between(now, now + timedelta(days=1))
+
+    # Overlapping OFF runs of home and office become one event
+    assert [(e.start.hour, e.end.hour, e.summary) for e in events] == [(5, 9, STATE_OFF), (12, 13, STATE_POSSIBLE_ON)]
+    assert groups.get_event_at(now.replace(hour=8)).start == now.replace(hour=5)
+    # The groups' own events are left untouched
+    assert [(e.start.hour, e.end.hour) for e in groups.coordinators[0].events] == [(5, 7)]
+
+    # Merged events are kept until a group rebuilds its index
+    assert groups.get_events_between(now, now + timedelta(days=1))[0] is events[0]
+    groups.coordinators[2].schedule = GroupSchedule.from_tokens([["В"] * 48])
+    groups.coordinators[2]._index_day_start = None
+    assert groups.get_events_between(now, now + timedelta(days=1))[0].start == now.replace(hour=0)
+
+
+def test_merged_calendar_follows_the_schedule_dates(groups, monkeypatch):
+    # After midnight the schedules still start with yesterday, today is their second day
+    now = at(monkeypatch, 4)
+    yesterday = now - timedelta(days=1)
+    for coordinator, tokens in zip(groups.coordinators, (HOME, OFFICE, FLAT)):
+        coordinator.schedule = GroupSchedule.from_tokens([FLAT, tokens])
+        coordinator.schedule_date = yesterday.date()
+    groups.primary.hub.archive.add([(yesterday.date() - timedelta(days=1), "2", DaySchedule.from_tokens(HOME))])
+
+    events = groups.get_events_between(now, now + timedelta(days=1))
+    assert [(e.start, e.end, e.summary) for e in events] == [
+        (now.replace(hour=5), now.replace(hour=9), STATE_OFF),
+        (now.replace(hour=12), now.replace(hour=13), STATE_POSSIBLE_ON),
+    ]
+    assert groups.get_event_at(now.replace(hour=8)).start == now.replace(hour=5)
+
+    # Archived days are merged in as in the groups' own calendars
+    events = groups.get_events_between(now - timedelta(days=7), now.replace(hour=8))
+    assert [(e.start, e.end) for e in events] == [
+        (yesterday.replace(hour=5) - timedelta(days=1), yesterday.replace(hour=7) - timedelta(days=1)),
+        (now.replace(hour=5), now.replace(hour=9)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_diagnostics(hass, groups):
+    entry = groups.primary.config_entry
+    entry.runtime_data = groups
+    groups.primary.hub.metrics.count("requests")
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"][EXTRA_GROUPS_CONF] == ["5", "9"]
+    assert [c["group"] for c in diagnostics["coordinators"]] == ["2", "5", "9"]
+    assert diagnostics["coordinators"][0]["days"] == 1
+    assert diagnostics["metrics"]["counters"] == {"requests": 1}
@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+
+from custom_components.chernivtsi_poweroff.archive import RECORD, ScheduleArchive
+from custom_components.chernivtsi_poweroff.schedule import DaySchedule
+
+START = date(2024, 1, 1)
+
+
+def test_add_query_and_reload(tmp_path):
+    path = tmp_path / "archive.bin"
+    archive = ScheduleArchive(path)
+    archive.load()
+    assert len(archive) == 0
+
+    encoded = archive.add(
+        (START + timedelta(days=day), str(group), DaySchedule(off=day, possible_on=group << 40))
+        for day in range(3 * 365)
+        for group in range(12, 0, -1)
+    )
+    archive.write(encoded)
+    assert path.stat().st_size == 3 * 365 * 12 * RECORD.size
+
+    # Already archived group-days and days before the newest one are skipped
+    assert archive.add([(START + timedelta(days=3 * 365 - 1), "5", DaySchedule()), (START, "1", DaySchedule())]) == b""
+
+    reloaded = ScheduleArchive(path)
+    reloaded.load()
+    days = reloaded.query(START + timedelta(days=400), START + timedelta(days=402), "5")
+    assert [(day, group, schedule.off) for day, group, schedule in days] == [
+        (START + timedelta(days=400 + offset), "5", 400 + offset) for offset in range(3)
+    ]
+    assert [group for _, group, _ in reloaded.query(START, START)] == [str(group) for group in range(1, 13)]
+    assert reloaded.query(START - timedelta(days=10), START - timedelta(days=1)) == []
+
+
+def test_torn_record_is_dropped(tmp_path):
+    path = tmp_path / "archive.bin"
+    archive = ScheduleArchive(path)
+    archive.write(archive.add([(START, "2", DaySchedule(off=0b11))]))
+    with path.open("ab") as file:
+        file.write(b"\x01\x02\x03")
+
+    reloaded = ScheduleArchive(path)
+    reloaded.load()
+    assert len(reloaded) == 1
+    assert reloaded.query(START, START)[0][2] == DaySchedule(off=0b11)
@@ -0,0 +1,302 @@
+from datetime import date, datetime, timedelta
+import time
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.chernivtsi_poweroff.const import (
+    EVENT_SCHEDULE_CHANGED,
+    POWEROFF_GROUP_CONF,
+    STATE_OFF,
+    STATE_ON,
+    STATE_POSSIBLE_ON,
+    PowerOffGroup,
+)
+from custom_components.chernivtsi_poweroff.coordinator import ChernivtsiPowerOffCoordinator
+from custom_components.chernivtsi_poweroff.schedule import DaySchedule, GroupSchedule
+
+TZ = ZoneInfo("Europe/Kyiv")
+
+# Today: OFF 05:00-07:00, POSSIBLE ON 07:00-08:00, OFF 23:30-24:00; tomorrow: OFF 00:00-01:00
+TODAY = ["З"] * 10 + ["В"] * 4 + ["МЗ"] * 2 + ["З"] * 31 + ["В"]
+TOMORROW = ["В"] * 2 + ["З"] * 46
+
+
+@pytest.fixture
+def coordinator(hass, make_config_entry, monkeypatch):
+    monkeypatch.setattr(dt_util, "DEFAULT_TIME_ZONE", TZ)
+    coordinator = ChernivtsiPowerOffCoordinator(hass, make_config_entry(**{POWEROFF_GROUP_CONF: PowerOffGroup.Two}))
+    coordinator.schedule = GroupSchedule.from_tokens([TODAY, TOMORROW])
+    coordinator.schedule_date = date(2026, 10, 17)
+    return coordinator
+
+
+def at(monkeypatch, hour: int, minute: int = 0, days: int = 0) -> datetime:
+    now = datetime(2026, 10, 17, hour, minute, tzinfo=TZ) + timedelta(days=days)
+    monkeypatch.setattr(dt_util, "now", lambda time_zone=None: now)
+    return now
+
+
+def test_state_and_event_lookups(coordinator, monkeypatch):
+    now = at(monkeypatch, 6)
+    assert coordinator.current_state == STATE_OFF
+    event = coordinator.get_event_at(now)
+    assert (event.start.hour, event.end.hour, event.summary) == (5, 7, STATE_OFF)
+    assert coordinator.next_poweron == now.replace(hour=7)
+    assert coordinator.next_poweroff == now.replace(hour=7)
+
+    now = at(monkeypatch, 7, 30)
+    assert coordinator.current_state == STATE_POSSIBLE_ON
+    assert coordinator.next_poweron == now.replace(hour=8, minute=0)
+
+    # Boundaries are half-open: at 08:00 the POSSIBLE ON run is over
+    now = at(monkeypatch, 8)
+    assert coordinator.current_state == STATE_ON
+    assert coordinator.get_event_at(now) is None
+    assert coordinator.next_poweroff == now.replace(hour=23, minute=30)
+    # The OFF run that starts at 23:30 continues past midnight into tomorrow
+    assert coordinator.next_poweron == now.replace(hour=1) + timedelta(days=1)
+    now = at(monkeypatch, 23, 45)
+    event = coordinator.get_event_at(now)
+    assert (event.start, event.end) == (now.replace(minute=30), now.replace(hour=1, minute=0) + timedelta(days=1))
+
+
+def test_index_is_rebuilt_on_refresh_and_rollover(coordinator, monkeypatch):
+    at(monkeypatch, 6)
+    assert coordinator.current_state == STATE_OFF
+    index = coordinator._transitions
+
+    at(monkeypatch, 6, 30)
+    assert coordinator.current_state == STATE_OFF
+    assert coordinator._transitions is index
+
+    # After midnight the same page is read from its second day until the next refresh
+    now = at(monkeypatch, 0, 30, days=1)
+    assert coordinator.current_state == STATE_OFF
+    assert coordinator._transitions is not index
+    assert coordinator.next_poweron == now.replace(hour=1)
+    now = at(monkeypatch, 6, days=1)
+    assert coordinator.current_state == STATE_ON
+    assert coordinator.next_poweroff is None
+    assert coordinator.outage_stats["off_hours_today"] == 1.0
+    assert coordinator.outage_stats["off_hours_tomorrow"] is None
+    # Yesterday is still served from the schedule until the hub archives it
+    events = coordinator.get_events_between(now - timedelta(days=1), now)
+    assert [(e.start.day, e.start.hour, e.summary) for e in events] == [
+        (17, 5, STATE_OFF),
+        (17, 7, STATE_POSSIBLE_ON),
+        (17, 23, STATE_OFF),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_transition_timer_pushes_state_at_boundaries(coordinator, monkeypatch):
+    updates = []
+    coordinator.async_add_listener(lambda: updates.append(coordinator.current_state))
+
+    now = at(monkeypatch, 4)
+    coordinator._async_schedule_transition()
+    assert coordinator.next_transition == now.replace(hour=5)
+
+    # The timer fires at 05:00: entities are written and the next boundary is armed
+    now = at(monkeypatch, 5)
+    coordinator._async_handle_transition(now)
+    assert updates == [STATE_OFF]
+    assert coordinator.next_transition == now.replace(hour=7)
+
+    # After the last boundary of the day the timer waits for midnight
+    now = at(monkeypatch, 23, 30)
+    coordinator._async_handle_transition(now)
+    assert coordinator.next_transition == now.replace(hour=0, minute=0) + timedelta(days=1)
+
+    # At midnight the OFF run goes on with tomorrow's first slots instead of replaying today's
+    now = at(monkeypatch, 0, days=1)
+    coordinator._async_handle_transition(now)
+    assert updates[-1] == STATE_OFF
+    assert coordinator.next_transition == now.replace(hour=1)
+
+    await coordinator.async_shutdown()
+    assert coordinator.next_transition is None
+    assert coordinator._unsub_transition is None
+
+
+def test_adaptive_refresh_interval(coordinator, monkeypatch):
+    at(monkeypatch, 12)
+    coordinator.hub.content_hash = "a"
+    intervals = []
+    for _ in range(4):
+        coordinator._async_adapt_interval(success=True)
+        intervals.append(coordinator.update_interval.total_seconds())
+    # Unchanged page: 600 s, then doubling up to the cap
+    assert intervals == [600, 1200, 1800, 1800]
+
+    coordinator.hub.content_hash = "b"
+    coordinator._async_adapt_interval(success=True)
+    assert coordinator.update_interval.total_seconds() == 600
+
+    # Evening without tomorrow's schedule polls fast
+    now = at(monkeypatch, 19)
+    coordinator.schedule = GroupSchedule.from_tokens([TODAY])
+    coordinator._async_adapt_interval(success=True)
+    assert coordinator.update_interval.total_seconds() == 180
+    assert coordinator.next_refresh == now + timedelta(seconds=180)
+
+    # Failures back off exponentially with jitter
+    delays = []
+    for _ in range(4):
+        coordinator._async_adapt_interval(success=False)
+        delays.append(coordinator.update_interval.total_seconds())
+    for delay, base in zip(delays, [600, 1200, 2400, 3600]):
+        assert base * 0.8 <= delay <= base * 1.2
+
+
+def test_restore_from_hub_cache(coordinator, monkeypatch):
+    now = at(monkeypatch, 6)
+    coordinator.schedule = GroupSchedule()
+    assert not coordinator.async_restore()
+
+    cached = GroupSchedule.from_tokens([TODAY, TOMORROW])
+    coordinator.hub._schedules = {"2": cached}
+    coordinator.hub.fetched_at = now - timedelta(minutes=30)
+    monkeypatch.setattr(dt_util, "utcnow", lambda: now)
+
+    assert coordinator.async_restore()
+    assert coordinator.data is cached
+    assert coordinator.current_state == STATE_OFF
+    assert coordinator.data_age == timedelta(minutes=30)
+    assert coordinator.next_transition == now.replace(hour=7)
+
+
+def test_group_switch_uses_cached_page(coordinator, monkeypatch):
+    at(monkeypatch, 6)
+    five = GroupSchedule.from_tokens([["В"] * 48])
+    coordinator.hub._schedules = {"2": coordinator.schedule, "5": five}
+
+    # A stale page cannot serve the new group, the caller has to refresh
+    assert not coordinator.update_group(PowerOffGroup.Five)
+    assert coordinator.schedule == GroupSchedule()
+
+    coordinator.hub._fetched_at = time.monotonic()
+    assert coordinator.update_group(PowerOffGroup.Five)
+    assert coordinator.group == PowerOffGroup.Five
+    assert coordinator.data is five
+    assert coordinator.current_state == STATE_OFF
+
+
+@pytest.mark.asyncio
+async def test_refresh_publishes_only_changed_slots(coordinator, hass, monkeypatch):
+    now = at(monkeypatch, 4)
+    edited = TODAY[:20] + ["В"] + TODAY[21:]
+    pages = [
+        GroupSchedule.from_tokens([TODAY, TOMORROW]),
+        GroupSchedule.from_tokens([edited, TOMORROW]),
+        GroupSchedule.from_tokens([edited, TOMORROW]),
+    ]
+
+    async def get_schedule(group, max_age):
+        return pages.pop(0)
+
+    monkeypatch.setattr(coordinator.hub, "async_get_schedule", get_schedule)
+    updates = []
+    events = []
+    refreshes = []
+    coordinator.async_add_listener(lambda: updates.append(coordinator.data))
+    coordinator.async_add_refresh_listener(lambda: refreshes.append(coordinator.next_refresh))
+    hass.bus.async_listen(EVENT_SCHEDULE_CHANGED, events.append)
+
+    # The first refresh publishes the schedule without a change event
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert len(updates) == 1
+    assert events == []
+
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert len(updates) == 2
+    assert coordinator.changed_slots == [(0, 20)]
+    assert events[0].data["group"] == "2"
+    assert events[0].data["changes"] == [
+        {"day": 0, "slot": 20, "start": now.replace(hour=10).isoformat(), "from": STATE_ON, "to": STATE_OFF}
+    ]
+
+    # An identical page wakes nobody but the sensors of the refresh itself
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert len(updates) == 2
+    assert len(events) == 1
+    assert len(refreshes) == 3
+    assert refreshes[-1] == coordinator.next_refresh
+    await coordinator.async_shutdown()
+
+
+def test_events_between_use_overlap_semantics(coordinator, monkeypatch):
+    now = at(monkeypatch, 4)
+
+    # A window inside an event still returns it
+    events = coordinator.get_events_between(now.replace(hour=5, minute=30), now.replace(hour=6))
+    assert [(e.start.hour, e.end.hour, e.summary) for e in events] == [(5, 7, STATE_OFF)]
+    # Touching boundaries are not overlaps
+    assert coordinator.get_events_between(now.replace(hour=8), now.replace(hour=23, minute=30)) == []
+
+    week = coordinator.get_events_between(now - timedelta(days=3), now + timedelta(days=4))
+    assert [e.summary for e in week] == [STATE_OFF, STATE_POSSIBLE_ON, STATE_OFF]
+    # The last event runs past midnight into tomorrow's OFF slots
+    assert week[-1].end == now.replace(hour=1) + timedelta(days=1)
+    # Events are built once per index and shared between queries
+    assert coordinator.get_event_at(now.replace(hour=6)) is week[0]
+    assert coordinator.get_events_between(now, now + timedelta(days=1))[0] is week[0]
+
+
+def test_past_events_come_from_the_archive(coordinator, monkeypatch):
+    now = at(monkeypatch, 6)
+    yesterday = now - timedelta(days=1)
+    coordinator.hub.archive.add(
+        [
+            (yesterday.date(), "2", DaySchedule.from_tokens(TOMORROW)),
+            (yesterday.date(), "5", DaySchedule.from_tokens(TODAY)),
+        ]
+    )
+
+    events = coordinator.get_events_between(now - timedelta(days=7), now.replace(hour=7, minute=30))
+    assert [(e.start, e.end, e.summary) for e in events] == [
+        (yesterday.replace(hour=0), yesterday.replace(hour=1), STATE_OFF),
+        (now.replace(hour=5), now.replace(hour=7), STATE_OFF),
+        (now.replace(hour=7), now.replace(hour=8), STATE_POSSIBLE_ON),
+    ]
+    # Windows that end before the archived events start skip them
+    assert coordinator.get_events_between(now - timedelta(days=7), yesterday.replace(hour=0)) == []
+
+
+def test_outage_stats(coordinator, monkeypatch):
+    now = at(monkeypatch, 6)
+    day = now.date()
+    coordinator.hub.archive.add(
+        [
+            (day - timedelta(days=37), "2", DaySchedule(off=(1 << 10) - 1)),
+            (day - timedelta(days=7), "2", DaySchedule(off=0b1111)),
+            (day - timedelta(days=5), "2", DaySchedule(off=(1 << 48) - 1)),
+            (day - timedelta(days=1), "2", DaySchedule.from_tokens(TOMORROW)),
+            (day - timedelta(days=1), "5", DaySchedule(off=(1 << 48) - 1)),
+        ]
+    )
+
+    stats = coordinator.outage_stats
+    assert stats == {
+        "off_hours_today": 2.5,
+        "off_hours_tomorrow": 1.0,
+        # Monday 12th (24 h), Friday 16th (1 h), today and tomorrow
+        "off_hours_week": 28.5,
+        "longest_outage_today": 2.0,
+        "possible_on_share_today": 100 * 2 / 48,
+        "off_hours_7d": 27.5,
+        "off_hours_30d": 29.5,
+    }
+    assert coordinator.outage_stats is stats
+
+    # A new archived day or schedule recomputes them
+    coordinator.schedule = GroupSchedule.from_tokens([TODAY])
+    coordinator._index_day_start = None
+    assert coordinator.outage_stats["off_hours_tomorrow"] is None
+    assert coordinator.outage_stats["off_hours_week"] == 27.5
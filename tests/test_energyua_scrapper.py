@@ -3,61 +3,38 @@ from pathlib import Path
 from aioresponses import aioresponses
 import pytest
 
-from lviv_poweroff.energyua_scrapper import EnergyUaScrapper
-from lviv_poweroff.entities import PowerOffPeriod
+from custom_components.chernivtsi_poweroff.const import PowerOffGroup, STATE_OFF, STATE_POSSIBLE_ON
+from custom_components.chernivtsi_poweroff.energyua_scrapper import URL, EnergyUaScrapper
+from custom_components.chernivtsi_poweroff.entities import PowerOffPeriod
 
 
-def load_energyua_page(test_page: str) -> str:
-    test_file = Path(__file__).parent / test_page
-
-    with open(test_file, encoding="utf-8") as file:
-        return file.read()
+def load_page(test_page: str) -> str:
+    return (Path(__file__).parent / test_page).read_text(encoding="utf-8")
 
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    "group,test_page,expected_result",
+    "group,expected_result",
     [
         (
-            "1.2",
-            "energyua_12_page.html",
+            PowerOffGroup.Two,
             [
-                PowerOffPeriod(23, 0, today=True),
-                PowerOffPeriod(0, 2, today=True),
-                PowerOffPeriod(6, 8, today=True),
-                PowerOffPeriod(11, 14, today=True),
-                PowerOffPeriod(16, 20, today=True),
-                PowerOffPeriod(22, 0, today=True),
-                PowerOffPeriod(7, 9, today=False),
-                PowerOffPeriod(19, 21, today=False),
+                PowerOffPeriod(1350, 1440, today=True, state=STATE_OFF),
+                PowerOffPeriod(900, 930, today=True, state=STATE_POSSIBLE_ON),
+                PowerOffPeriod(1320, 1350, today=True, state=STATE_POSSIBLE_ON),
             ],
         ),
-        (
-            "1.1",
-            "energyua_11_page.html",
-            [
-                PowerOffPeriod(0, 1, today=True),
-                PowerOffPeriod(7, 9, today=True),
-                PowerOffPeriod(14, 15, today=True),
-                PowerOffPeriod(19, 22, today=True),
-            ],
-        ),
-        (
-            "1.2",
-            "energyua_12_nodata_page.html",
-            [],
-        ),
+        # Groups without a container on the page have no periods
+        (PowerOffGroup.Five, []),
     ],
 )
-async def test_energyua_scrapper(group, test_page, expected_result) -> None:
-    # Given a response from the EnergyUa website
+async def test_energyua_scrapper(group, expected_result) -> None:
+    # Given a response from the oblenergo website
     with aioresponses() as mock:
-        mock.get(f"https://lviv.energy-ua.info/grupa/{group}", body=load_energyua_page(test_page))
+        mock.get(URL, body=load_page("oblenergo_test.html"))
         # When scrapper is called for power-off periods
         scrapper = EnergyUaScrapper(group)
         poweroffs = await scrapper.get_power_off_periods()
 
     # Then the power-off periods are extracted correctly
-    assert poweroffs is not None
-    assert len(poweroffs) == len(expected_result)
     assert poweroffs == expected_result
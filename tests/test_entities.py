@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.chernivtsi_poweroff.entities import PowerOffPeriod, local_day_start
+
+TZ = ZoneInfo("Europe/Kyiv")
+
+
+def freeze(monkeypatch, now: datetime) -> None:
+    monkeypatch.setattr(dt_util, "now", lambda time_zone=None: now.astimezone(time_zone or dt_util.DEFAULT_TIME_ZONE))
+
+
+def test_periods_use_wall_clock_across_dst_change(monkeypatch):
+    # Clocks go back from 04:00 to 03:00 in Kyiv on 2026-10-25
+    freeze(monkeypatch, datetime(2026, 10, 25, 1, 0, tzinfo=TZ))
+    start, end = PowerOffPeriod(2 * 60, 5 * 60, today=True).to_datetime_period(TZ)
+
+    assert (start.hour, end.hour) == (2, 5)
+    assert start.utcoffset() == timedelta(hours=3)
+    assert end.utcoffset() == timedelta(hours=2)
+    assert dt_util.as_utc(end) - dt_util.as_utc(start) == timedelta(hours=4)
+
+
+def test_periods_follow_requested_time_zone(monkeypatch):
+    monkeypatch.setattr(dt_util, "DEFAULT_TIME_ZONE", ZoneInfo("UTC"))
+    # 23:30 UTC is already the next day in Kyiv
+    freeze(monkeypatch, datetime(2026, 10, 16, 23, 30, tzinfo=ZoneInfo("UTC")))
+    start, end = PowerOffPeriod(22 * 60, 24 * 60, today=False).to_datetime_period(TZ)
+
+    assert start == datetime(2026, 10, 18, 22, 0, tzinfo=TZ)
+    assert end == datetime(2026, 10, 19, 0, 0, tzinfo=TZ)
+
+
+def test_conversion_is_memoized_until_rollover(monkeypatch):
+    freeze(monkeypatch, datetime(2026, 10, 17, 10, 0, tzinfo=TZ))
+    period = PowerOffPeriod(60, 120, today=True)
+    first = period.to_datetime_period(TZ)
+
+    assert local_day_start(TZ) is local_day_start(TZ)
+    assert period.to_datetime_period(TZ)[0] is first[0]
+
+    period.end = 180
+    assert period.to_datetime_period(TZ)[1].hour == 3
+
+    freeze(monkeypatch, datetime(2026, 10, 18, 0, 5, tzinfo=TZ))
+    assert period.to_datetime_period(TZ)[0] == datetime(2026, 10, 18, 1, 0, tzinfo=TZ)
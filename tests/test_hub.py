@@ -0,0 +1,480 @@
+import asyncio
+from collections.abc import Awaitable
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import time
+from zoneinfo import ZoneInfo
+
+from aioresponses import aioresponses
+import pytest
+
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from custom_components.chernivtsi_poweroff.breaker import STATE_CLOSED, STATE_OPEN, CircuitOpenError
+from custom_components.chernivtsi_poweroff.const import (
+    BREAKER_THRESHOLD,
+    CACHE_MAX_AGE,
+    PROCESS_POOL_MIN_PAGE_SIZE,
+    PowerOffGroup,
+    STATE_OFF,
+)
+from custom_components.chernivtsi_poweroff.energyua_scrapper import URL
+from custom_components.chernivtsi_poweroff.hub import STORAGE_KEY, ChernivtsiPowerOffHub, async_get_hub
+from custom_components.chernivtsi_poweroff.page_parser import PageStructureError, ParsedPage
+from custom_components.chernivtsi_poweroff.schedule import DaySchedule, GroupSchedule
+from custom_components.chernivtsi_poweroff.snapshot import Snapshot, encode_snapshot
+from tests.fake_oblenergo import random_schedules
+
+
+def load_page() -> str:
+    return (Path(__file__).parent / "oblenergo_test.html").read_text(encoding="utf-8")
+
+
+async def max_loop_stall(awaitable: Awaitable) -> float:
+    """Await while ticking the event loop, return the longest gap between ticks in seconds."""
+    task = asyncio.ensure_future(awaitable)
+    stall = 0.0
+    last = time.perf_counter()
+    while not task.done():
+        await asyncio.sleep(0)
+        now = time.perf_counter()
+        stall = max(stall, now - last)
+        last = now
+    await task
+    return stall
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_fetch(hass, monkeypatch):
+    hub = ChernivtsiPowerOffHub(hass)
+    calls = 0
+
+    async def fetch_page(conditional: bool = False) -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return load_page()
+
+    monkeypatch.setattr(hub.api, "fetch_page", fetch_page)
+
+    results = await asyncio.gather(
+        *(
+            hub.async_get_schedule(group, max_age=300)
+            for group in (PowerOffGroup.Two, PowerOffGroup.Two, PowerOffGroup.Five)
+        )
+    )
+
+    assert calls == 1
+    assert [p.state for p in results[0].periods].count(STATE_OFF) == 1
+    assert results[2].periods == []
+
+    # A fresh page is served from memory, an expired one is fetched again
+    await hub.async_get_schedule(PowerOffGroup.Two, max_age=300)
+    assert calls == 1
+    await hub.async_get_schedule(PowerOffGroup.Two, max_age=0)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused_and_closed(hass):
+    hub = ChernivtsiPowerOffHub(hass)
+
+    with aioresponses() as mock:
+        mock.get(URL, body=load_page(), repeat=True)
+        await hub.async_refresh()
+        session = hub.api.session
+        await hub.async_refresh()
+
+    assert session is not None
+    assert hub.api.session is session
+    await hub.async_close()
+    assert session.closed
+    assert hub.api.session is None
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_and_unchanged_content_skip_parsing(hass, monkeypatch):
+    hub = ChernivtsiPowerOffHub(hass)
+    parses = 0
+    parse_page = hub.api.parse_page
+
+    def counting_parse_page(content: str) -> ParsedPage:
+        nonlocal parses
+        parses += 1
+        return parse_page(content)
+
+    monkeypatch.setattr(hub.api, "parse_page", counting_parse_page)
+
+    with aioresponses() as mock:
+        mock.get(URL, body=load_page(), headers={"ETag": '"v1"'})
+        mock.get(URL, status=304)
+        mock.get(URL, body=load_page())
+        for _ in range(3):
+            await hub.async_refresh()
+        requests = [call.kwargs["headers"] for call in next(iter(mock.requests.values()))]
+
+    assert "If-None-Match" not in requests[0]
+    assert requests[1]["If-None-Match"] == '"v1"'
+    # 304 and an identical body without validators are both served from the parsed page
+    assert parses == 1
+    schedule = await hub.async_get_schedule(PowerOffGroup.Two, max_age=300)
+    assert [p.state for p in schedule.periods].count(STATE_OFF) == 1
+
+
+@pytest.mark.asyncio
+async def test_group_validation_reuses_the_parsed_page(hass, monkeypatch):
+    hub = ChernivtsiPowerOffHub(hass)
+    calls = 0
+
+    async def fetch_page(conditional: bool = False) -> str:
+        nonlocal calls
+        calls += 1
+        return load_page()
+
+    monkeypatch.setattr(hub.api, "fetch_page", fetch_page)
+
+    assert await hub.async_has_groups([PowerOffGroup.Two], max_age=300)
+    assert calls == 1
+    # The fresh page answers every later check and serves the coordinators
+    assert not await hub.async_has_groups([PowerOffGroup.Two, "99"], max_age=300)
+    await hub.async_get_schedule(PowerOffGroup.Two, max_age=300)
+    assert calls == 1
+    assert await hub.async_has_groups([PowerOffGroup.Two], max_age=0)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_hub_against_fake_server(hass, fake_oblenergo):
+    hub = ChernivtsiPowerOffHub(hass, url=fake_oblenergo.url)
+    fake_oblenergo.latency = 0.01
+
+    schedules = await asyncio.gather(*(hub.async_get_schedule(group, max_age=300) for group in ("1", "2", "5", "12")))
+    assert fake_oblenergo.stats["requests"] == 1
+    assert schedules[1] == GroupSchedule.from_tokens(fake_oblenergo.schedules["2"])
+
+    # An unchanged page is answered with 304, a new one is parsed again
+    await hub.async_get_schedule("2", max_age=0)
+    assert fake_oblenergo.stats["not_modified"] == 1
+    fake_oblenergo.set_schedules(random_schedules(seed=1))
+    schedule = await hub.async_get_schedule("2", max_age=0)
+    assert schedule == GroupSchedule.from_tokens(fake_oblenergo.schedules["2"])
+    assert fake_oblenergo.stats["requests"] == 3
+    await hub.async_close()
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_and_outages_open_the_breaker(hass, fake_oblenergo):
+    hub = ChernivtsiPowerOffHub(hass, url=fake_oblenergo.url)
+    hub.api.retry_backoff = 0
+    expected = GroupSchedule.from_tokens(fake_oblenergo.schedules["2"])
+
+    # A short burst of 5xx is absorbed by the retries
+    fake_oblenergo.fail(2)
+    assert await hub.async_get_schedule("2", max_age=0) == expected
+    assert fake_oblenergo.stats["requests"] == 3
+
+    # An error page is never parsed into an empty schedule, the last good page is served
+    fake_oblenergo.fail(100)
+    for _ in range(BREAKER_THRESHOLD):
+        assert await hub.async_get_schedule("2", max_age=0) == expected
+    assert hub.breaker.state == STATE_OPEN
+    requests = fake_oblenergo.stats["requests"]
+    assert requests == 3 + BREAKER_THRESHOLD * (hub.api.retries + 1)
+
+    # While the breaker is open nothing is sent
+    assert await hub.async_get_schedule("2", max_age=0) == expected
+    assert fake_oblenergo.stats["requests"] == requests
+    assert hub.metrics.counters["stale_served"] == BREAKER_THRESHOLD + 1
+
+    # Without a good page to fall back on the failure is raised
+    hub._schedules = {}
+    with pytest.raises(CircuitOpenError):
+        await hub.async_get_schedule("2", max_age=0)
+
+    # After the cooldown a successful trial closes the breaker
+    fake_oblenergo.fail(0)
+    hub.breaker._retry_at = time.monotonic()
+    hub.content_hash = None
+    assert await hub.async_get_schedule("2", max_age=0) == expected
+    assert hub.breaker.state == STATE_CLOSED
+    await hub.async_close()
+
+
+@pytest.mark.asyncio
+async def test_hub_imports_a_snapshot_without_parsing(hass, fake_oblenergo, monkeypatch):
+    source = ChernivtsiPowerOffHub(hass, url=fake_oblenergo.url)
+    assert source.snapshot() is None
+    expected = await source.async_get_schedule("2", max_age=0)
+    data = source.snapshot()
+    assert source.snapshot() is data
+
+    hub = ChernivtsiPowerOffHub(hass)
+    hub.async_set_snapshot_source("snapshot", "http://source.local/api/chernivtsi_poweroff/snapshot", "secret")
+    # Entries without a source do not override the one that is set
+    hub.async_set_snapshot_source("scraping", None)
+    monkeypatch.setattr(hub.api, "parse_page", lambda content: pytest.fail("parsed HTML"))
+    with aioresponses() as mock:
+        mock.get(hub.snapshot_url, body=data, headers={"ETag": '"s1"'})
+        mock.get(hub.snapshot_url, status=304)
+        assert await hub.async_get_schedule("2", max_age=0) == expected
+        assert await hub.async_get_schedule("2", max_age=0) == expected
+        requests = next(iter(mock.requests.values()))
+
+    assert requests[0].kwargs["headers"]["Authorization"] == "Bearer secret"
+    assert requests[1].kwargs["headers"]["If-None-Match"] == '"s1"'
+    # The data age is the one of the source page
+    assert hub.fetched_at == source.fetched_at.replace(microsecond=0)
+    assert hub.groups == source.groups
+
+    # Removing the entry that set the source goes back to scraping on the next refresh
+    hub.async_set_snapshot_source("snapshot", None)
+    assert hub.snapshot_url is None
+    assert not hub.is_fresh(CACHE_MAX_AGE)
+    assert hub.api.etag is None
+    await source.async_close()
+    await hub.async_close()
+
+
+@pytest.mark.asyncio
+async def test_pipeline_metrics(hass):
+    hub = ChernivtsiPowerOffHub(hass)
+    page = load_page()
+
+    with aioresponses() as mock:
+        mock.get(URL, body=page, headers={"ETag": '"v1"'})
+        mock.get(URL, status=304)
+        await hub.async_refresh()
+        # Stage timings are only taken once a debug sensor switched them on
+        assert hub.metrics.timings == {}
+        release = hub.metrics.enable()
+        await hub.async_refresh()
+        await hub.async_get_schedule(PowerOffGroup.Two, max_age=300)
+
+    # They stay on until the last debug sensor is removed
+    release_other = hub.metrics.enable()
+    release()
+    assert hub.metrics.enabled
+    release_other()
+    assert not hub.metrics.enabled
+
+    counters = hub.metrics.counters
+    assert counters["requests"] == 2
+    assert counters["not_modified"] == 1
+    assert counters["bytes_downloaded"] == len(page.encode())
+    assert counters["pages_parsed"] == 1
+    assert counters["cache_hits"] == 1
+    assert hub.metrics.last_ms("fetch") is not None
+    assert hub.metrics.last_ms("parse_job") is None
+    await hub.async_close()
+
+
+@pytest.mark.asyncio
+async def test_schedule_cache_is_restored_from_disk(hass):
+    hub = ChernivtsiPowerOffHub(hass)
+    with aioresponses() as mock:
+        mock.get(URL, body=load_page())
+        await hub.async_refresh()
+    await hub._store.async_save(hub._data_to_store())
+    await hub.async_close()
+
+    restored = ChernivtsiPowerOffHub(hass)
+    await restored.async_load()
+
+    assert restored.fetched_at == hub.fetched_at
+    assert restored.content_hash == hub.content_hash
+    assert restored.is_fresh(300)
+    assert restored.get_cached_schedule(PowerOffGroup.Two) == hub.get_cached_schedule(PowerOffGroup.Two)
+
+
+@pytest.mark.asyncio
+async def test_schedule_cache_drops_past_days_and_expired_data(hass, monkeypatch):
+    tz = ZoneInfo("Europe/Kyiv")
+    now = datetime(2026, 10, 17, 8, 0, tzinfo=tz)
+    monkeypatch.setattr(dt_util, "DEFAULT_TIME_ZONE", tz)
+    monkeypatch.setattr(dt_util, "now", lambda time_zone=None: now)
+    monkeypatch.setattr(dt_util, "utcnow", lambda: dt_util.as_utc(now))
+
+    hub = ChernivtsiPowerOffHub(hass)
+    fetched_yesterday = now - timedelta(hours=10)
+    # Version 1 caches have no first day, the fetch date stands in for it
+    await Store(hass, 1, STORAGE_KEY).async_save(
+        {"fetched_at": fetched_yesterday.isoformat(), "content_hash": "x", "groups": {"2": [[1, 0], [2, 0]]}}
+    )
+    await hub.async_load()
+    # Yesterday's "tomorrow" is today; the page hash no longer describes the shifted data
+    assert [day.off for day in hub.get_cached_schedule(PowerOffGroup.Two).days] == [2]
+    assert hub.content_hash is None
+    # Yesterday itself is final and goes to the archive
+    yesterday = now.date() - timedelta(days=1)
+    assert [(day, group, schedule.off) for day, group, schedule in hub.archive.query(yesterday, now.date())] == [
+        (yesterday, "2", 1)
+    ]
+
+    stale = ChernivtsiPowerOffHub(hass)
+    await stale._store.async_save(
+        {
+            "fetched_at": (now - timedelta(days=2)).isoformat(),
+            "content_hash": "x",
+            "first_day": (now.date() - timedelta(days=2)).isoformat(),
+            "groups": {"2": []},
+        }
+    )
+    await stale.async_load()
+    assert stale.fetched_at is None
+    assert stale.get_cached_schedule(PowerOffGroup.Two) is None
+
+
+@pytest.mark.asyncio
+async def test_schedule_cache_keeps_the_first_day_of_shifted_schedules(hass, monkeypatch):
+    tz = ZoneInfo("Europe/Kyiv")
+    now = datetime(2026, 10, 16, 22, 0, tzinfo=tz)
+    monkeypatch.setattr(dt_util, "DEFAULT_TIME_ZONE", tz)
+    monkeypatch.setattr(dt_util, "now", lambda time_zone=None: now)
+    monkeypatch.setattr(dt_util, "utcnow", lambda: dt_util.as_utc(now))
+
+    schedules = {"2": GroupSchedule([DaySchedule(1, 0), DaySchedule(2, 0)])}
+    data = encode_snapshot(Snapshot(schedules, now.date(), now - timedelta(hours=1), None))
+    hub = ChernivtsiPowerOffHub(hass)
+    hub.async_set_snapshot_source("snapshot", "http://source.local/api/chernivtsi_poweroff/snapshot")
+    with aioresponses() as mock:
+        mock.get(hub.snapshot_url, body=data, headers={"ETag": '"s1"'})
+        mock.get(hub.snapshot_url, status=304)
+        await hub.async_refresh()
+        # Past midnight the source has nothing new, the days shift while the fetch time stays
+        now += timedelta(hours=4)
+        await hub.async_refresh()
+    assert hub.schedules_date == now.date()
+    assert hub.fetched_at.date() == date(2026, 10, 16)
+    await hub._store.async_save(hub._data_to_store())
+
+    restored = ChernivtsiPowerOffHub(hass)
+    await restored.async_load()
+    assert restored.schedules_date == now.date()
+    assert [day.off for day in restored.get_cached_schedule(PowerOffGroup.Two).days] == [2]
+
+
+@pytest.mark.asyncio
+async def test_invalid_or_failing_schedule_cache_does_not_break_setup(hass, monkeypatch):
+    hub = ChernivtsiPowerOffHub(hass)
+    await hub._store.async_save({"fetched_at": dt_util.utcnow().isoformat(), "groups": {"2": [[1]]}})
+    await hub.async_load()
+    assert hub.fetched_at is None
+    assert hub.get_cached_schedule(PowerOffGroup.Two) is None
+
+    failing = ChernivtsiPowerOffHub(hass)
+    store_load = failing._store.async_load
+
+    async def broken_load() -> None:
+        raise OSError("disk")
+
+    monkeypatch.setattr(failing._store, "async_load", broken_load)
+    with pytest.raises(OSError):
+        await failing.async_load()
+    # The failure is not cached, the next setup loads again
+    monkeypatch.setattr(failing._store, "async_load", store_load)
+    await failing.async_load()
+
+
+@pytest.mark.asyncio
+async def test_parsing_does_not_block_the_event_loop(hass, monkeypatch):
+    hub = ChernivtsiPowerOffHub(hass)
+    parse_page = hub.api.parse_page
+
+    def slow_parse_page(content: str) -> ParsedPage:
+        time.sleep(0.3)
+        return parse_page(content)
+
+    monkeypatch.setattr(hub.api, "parse_page", slow_parse_page)
+
+    with aioresponses() as mock:
+        mock.get(URL, body=load_page())
+        stall = await max_loop_stall(hub.async_refresh())
+
+    assert stall < 0.1
+    assert hub.get_cached_schedule(PowerOffGroup.Two) is not None
+
+
+@pytest.mark.asyncio
+async def test_large_pages_are_parsed_in_a_worker_process(hass):
+    hub = ChernivtsiPowerOffHub(hass, process_pool_min_size=0)
+
+    with aioresponses() as mock:
+        mock.get(URL, body=load_page())
+        await hub.async_refresh()
+
+    assert hub._process_pool is not None
+    schedule = hub.get_cached_schedule(PowerOffGroup.Two)
+    assert [p.state for p in schedule.periods].count(STATE_OFF) == 1
+    await hub.async_close()
+    assert hub._process_pool is None
+
+    # The shared hub only sends unusually large pages to the worker
+    assert async_get_hub(hass).process_pool_min_size == PROCESS_POOL_MIN_PAGE_SIZE
+
+
+@pytest.mark.asyncio
+async def test_passed_days_are_archived_on_fetch(hass, monkeypatch):
+    tz = ZoneInfo("Europe/Kyiv")
+    now = datetime(2026, 10, 16, 22, 0, tzinfo=tz)
+    monkeypatch.setattr(dt_util, "DEFAULT_TIME_ZONE", tz)
+    monkeypatch.setattr(dt_util, "now", lambda time_zone=None: now)
+    monkeypatch.setattr(dt_util, "utcnow", lambda: dt_util.as_utc(now))
+
+    hub = ChernivtsiPowerOffHub(hass)
+    await hub.async_load()
+    with aioresponses() as mock:
+        mock.get(URL, body=load_page(), repeat=True)
+        await hub.async_refresh()
+        evening = hub.get_cached_schedule(PowerOffGroup.Two)
+        assert len(hub.archive) == 0
+
+        now += timedelta(hours=4)
+        await hub.async_refresh()
+
+    day = date(2026, 10, 16)
+    assert hub.archive.query(day, day, "2") == [(day, "2", evening.days[0])]
+
+    restored = ChernivtsiPowerOffHub(hass)
+    await restored.async_load()
+    assert len(restored.archive) == len(hub.archive)
+
+
+@pytest.mark.asyncio
+async def test_broken_pages_are_not_cached(hass, fake_oblenergo):
+    hub = ChernivtsiPowerOffHub(hass, url=fake_oblenergo.url)
+    good = await hub.async_get_schedule("2", max_age=0)
+    content_hash = hub.content_hash
+
+    fake_oblenergo.set_schedules(random_schedules(seed=1))
+    fake_oblenergo.truncate(1)
+    with pytest.raises(PageStructureError):
+        await hub.async_refresh()
+    # The last good page stays in place and the next fetch is unconditional
+    assert hub.get_cached_schedule("2") == good
+    assert hub.content_hash == content_hash
+    assert hub.api.etag is None
+    assert hub.metrics.counters["parse_errors"] == 1
+
+    schedule = await hub.async_get_schedule("2", max_age=0)
+    assert schedule == GroupSchedule.from_tokens(fake_oblenergo.schedules["2"])
+    await hub.async_close()
+
+
+@pytest.mark.asyncio
+async def test_page_date_binds_the_schedule_days(hass, fake_oblenergo, monkeypatch):
+    tz = ZoneInfo("Europe/Kyiv")
+    now = datetime(2026, 10, 17, 0, 30, tzinfo=tz)
+    monkeypatch.setattr(dt_util, "DEFAULT_TIME_ZONE", tz)
+    monkeypatch.setattr(dt_util, "now", lambda time_zone=None: now)
+
+    # Shortly after midnight the page still starts with yesterday
+    yesterday = date(2026, 10, 16)
+    fake_oblenergo.set_schedules(random_schedules(days=2), first_day=yesterday)
+    hub = ChernivtsiPowerOffHub(hass, url=fake_oblenergo.url)
+    schedule = await hub.async_get_schedule("2", max_age=0)
+
+    assert schedule == GroupSchedule.from_tokens(fake_oblenergo.schedules["2"][1:])
+    archived = GroupSchedule.from_tokens(fake_oblenergo.schedules["2"][:1]).days[0]
+    assert hub.archive.query(yesterday, yesterday, "2") == [(yesterday, "2", archived)]
+    await hub.async_close()
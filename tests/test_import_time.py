@@ -0,0 +1,60 @@
+"""Import-time checks for the integration modules loaded at Home Assistant boot."""
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+PACKAGE = "custom_components.chernivtsi_poweroff"
+# Budget for the integration's own modules (self time, excluding Home Assistant)
+SELF_TIME_BUDGET_US = 100_000
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+
+def _import(*modules: str) -> tuple[set[str], dict[str, int]]:
+    """Import modules in a fresh interpreter, return sys.modules and per-module self times."""
+    code = f"import sys; import {', '.join(modules)}; print(' '.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+        text=True,
+    )
+    self_times = {
+        match[3]: int(match[1]) for match in IMPORTTIME_LINE.finditer(result.stderr) if match[3].startswith(PACKAGE)
+    }
+    return set(result.stdout.split()), self_times
+
+
+def test_config_flow_skips_heavy_imports() -> None:
+    """Loading the config flow must not pull in the parser or the polling machinery."""
+    loaded, _ = _import(f"{PACKAGE}.config_flow")
+    assert "bs4" not in loaded
+    for module in (
+        "aggregate",
+        "archive",
+        "energyua_scrapper",
+        "coordinator",
+        "diagnostics",
+        "hub",
+        "page_parser",
+        "services",
+        "snapshot",
+        "view",
+    ):
+        assert f"{PACKAGE}.{module}" not in loaded
+
+
+def test_scrapper_defers_bs4() -> None:
+    """BeautifulSoup is only imported by the bs4 parser path."""
+    loaded, _ = _import(f"{PACKAGE}.energyua_scrapper")
+    assert "bs4" not in loaded
+
+
+def test_import_time_budget() -> None:
+    """Keep the self time of the integration modules in check."""
+    _, self_times = _import(f"{PACKAGE}.config_flow", f"{PACKAGE}.energyua_scrapper")
+    assert self_times
+    total = sum(self_times.values())
+    assert total < SELF_TIME_BUDGET_US, f"{total} us: {self_times}"
@@ -1,7 +1,11 @@
+from datetime import date
+
 from bs4 import BeautifulSoup
+import pytest
 
-from custom_components.chernivtsi_poweroff.energyua_scrapper import EnergyUaScrapper
+from custom_components.chernivtsi_poweroff.energyua_scrapper import PARSER_BS4, PARSER_FAST, EnergyUaScrapper
 from custom_components.chernivtsi_poweroff.const import PowerOffGroup, STATE_OFF, STATE_POSSIBLE_ON
+from custom_components.chernivtsi_poweroff.page_parser import PageStructureError
 
 
 def test_extract_tokens_today_and_tomorrow():
@@ -33,3 +37,104 @@ def test_tokens_to_periods_map_to_entities():
     assert all(p[0] % 30 == 0 and p[1] % 30 == 0 for p in periods_off)
 
 
+@pytest.mark.parametrize("parser", [PARSER_FAST, PARSER_BS4])
+def test_parse_groups_reads_every_container(parser):
+    html = (
+        "<html><body>"
+        + "".join(
+            f"<div id='inf{g}' data-id='{g}'>" + "<o>в</o>" * g + "<u>з</u>" * (48 - g) + "</div>" for g in range(1, 13)
+        )
+        + "</body></html>"
+    )
+    groups = EnergyUaScrapper(parser=parser).parse_groups(html)
+
+    assert sorted(groups, key=int) == [str(g) for g in range(1, 13)]
+    for g in range(1, 13):
+        assert groups[str(g)][0].count("В") == g
+
+
+def test_fast_parser_matches_beautifulsoup_on_fixture():
+    with open("tests/oblenergo_test.html", "r", encoding="utf-8") as f:
+        html = f.read()
+
+    fast = EnergyUaScrapper(parser=PARSER_FAST).parse_groups(html)
+    bs4 = EnergyUaScrapper(parser=PARSER_BS4).parse_groups(html)
+
+    assert fast == bs4
+    assert list(fast) == ["2"]
+    assert fast["2"][0][44:] == ["МЗ", "В", "В", "В"]
+
+
+def test_extract_tokens_classifies_each_cell_once():
+    html = (
+        "<div id='inf3' data-id='3'><table><tr>"
+        + "<td><o>в</o></td>" * 4
+        + "<td><s>мз</s></td>" * 2
+        + "<td>З</td>" * 42
+        + "</tr></table><div><div>"
+        + "<u>з</u>" * 48
+        + "</div></div></div>"
+    )
+    soup = BeautifulSoup(html, "html.parser")
+    tokens = EnergyUaScrapper()._extract_tokens(soup.select_one("div#inf3"))  # type: ignore[attr-defined]
+
+    assert tokens == [["В"] * 4 + ["МЗ"] * 2 + ["З"] * 42, ["З"] * 48]
+    assert EnergyUaScrapper(parser=PARSER_FAST).parse_groups(html)["3"] == tokens
+
+
+@pytest.mark.parametrize("parser", [PARSER_FAST, PARSER_BS4])
+def test_day_rows_and_page_date(parser):
+    html = (
+        "<html><body><h2>Графік відключень на 17.10.2026</h2>"
+        "<div id='inf4' data-id='4'><table>"
+        "<tr data-date='2026-10-17'>" + "<td><o>в</o></td>" * 6 + "<td><u>з</u></td>" * 42 + "</tr>"
+        "<tr data-date='2026-10-18'>" + "<td><s>мз</s></td>" * 48 + "</tr>"
+        "</table></div></body></html>"
+    )
+    page = EnergyUaScrapper(parser=parser).parse_page(html)
+
+    assert page.first_day == date(2026, 10, 17)
+    assert page.groups["4"] == [["В"] * 6 + ["З"] * 42, ["МЗ"] * 48]
+
+
+@pytest.mark.parametrize("parser", [PARSER_FAST, PARSER_BS4])
+def test_page_date_comes_from_the_schedule_header(parser):
+    html = (
+        "<html><body><p>Оновлено 16.10.2026 о 21:40</p>"
+        "<h3>Новини від 15.10.2026</h3>"
+        "<h2>Графік відключень на <b>17.10.2026</b></h2>"
+        "<div id='inf4' data-id='4'>" + "<u>з</u>" * 48 + "</div></body></html>"
+    )
+    assert EnergyUaScrapper(parser=parser).parse_page(html).first_day == date(2026, 10, 17)
+
+    # A page without a schedule header has no date rather than a decoy one
+    html = html.replace("Графік відключень на", "Відключення")
+    assert EnergyUaScrapper(parser=parser).parse_page(html).first_day is None
+
+
+@pytest.mark.parametrize("parser", [PARSER_FAST, PARSER_BS4])
+@pytest.mark.parametrize(
+    "cells",
+    [
+        # A flat day short of a cell
+        "<u>з</u>" * 47,
+        # Rows of the wrong length are not made whole by the next row
+        "<table><tr>" + "<td><u>з</u></td>" * 47 + "</tr><tr>" + "<td><u>з</u></td>" * 49 + "</tr></table>",
+        # A container without cells
+        "<p>Графік оновлюється</p>",
+    ],
+)
+def test_broken_layouts_raise(parser, cells):
+    html = f"<html><body><div id='inf1' data-id='1'>{cells}</div></body></html>"
+
+    with pytest.raises(PageStructureError):
+        EnergyUaScrapper(parser=parser).parse_groups(html)
+
+
+@pytest.mark.parametrize("parser", [PARSER_FAST, PARSER_BS4])
+def test_truncated_page_raises(parser):
+    with open("tests/oblenergo_test.html", "r", encoding="utf-8") as f:
+        html = f.read()
+
+    with pytest.raises(PageStructureError):
+        EnergyUaScrapper(parser=parser).parse_groups(html[: len(html) // 2])
@@ -0,0 +1,52 @@
+"""Relative performance checks of the pipeline benchmarks.
+
+Absolute timings depend on the machine, so these compare benchmarks with
+each other: the fast parser against BeautifulSoup, and how the parse and
+the coordinator queries scale with the size of the schedule.
+"""
+
+from custom_components.chernivtsi_poweroff.const import POWEROFF_GROUP_CONF, PowerOffGroup
+from custom_components.chernivtsi_poweroff.coordinator import ChernivtsiPowerOffCoordinator
+from custom_components.chernivtsi_poweroff.energyua_scrapper import PARSER_BS4, PARSER_FAST, EnergyUaScrapper
+from custom_components.chernivtsi_poweroff.schedule import GroupSchedule
+from tests.benchmarks.bench_pipeline import build_page, measure, random_tokens
+
+# The fast parser must stay well ahead of BeautifulSoup
+MIN_FAST_PARSER_SPEEDUP = 2
+# Allowed factor over linear growth for work that scales with the page or schedule size
+LINEAR_SLACK = 2
+# Allowed factor for queries that bisect the index regardless of its size
+BISECT_SLACK = 3
+
+
+def test_fast_parser_beats_bs4_and_scales_linearly() -> None:
+    fast = EnergyUaScrapper(parser=PARSER_FAST)
+    bs4 = EnergyUaScrapper(parser=PARSER_BS4)
+    small, large = build_page(12, days=2), build_page(120, days=2)
+
+    fast_small = measure(lambda: fast.parse_groups(small), number=5)
+    fast_large = measure(lambda: fast.parse_groups(large), number=5)
+    bs4_large = measure(lambda: bs4.parse_groups(large), number=2)
+
+    assert fast_large * MIN_FAST_PARSER_SPEEDUP < bs4_large
+    assert fast_large < fast_small * 10 * LINEAR_SLACK
+
+
+def test_coordinator_queries_scale_with_the_schedule(hass, make_config_entry) -> None:
+    coordinator = ChernivtsiPowerOffCoordinator(hass, make_config_entry(**{POWEROFF_GROUP_CONF: PowerOffGroup.One}))
+
+    def rebuild_index() -> None:
+        coordinator._index_day_start = None
+        coordinator._ensure_index()
+
+    timings = {}
+    for days in (2, 30):
+        coordinator.schedule = GroupSchedule.from_tokens(random_tokens(days, seed=days))
+        timings[days] = (
+            measure(rebuild_index, number=50),
+            measure(lambda: coordinator.current_state, number=2000),
+        )
+
+    (index_short, state_short), (index_long, state_long) = timings[2], timings[30]
+    assert index_long < index_short * 15 * LINEAR_SLACK
+    assert state_long < state_short * BISECT_SLACK
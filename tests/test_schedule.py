@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from custom_components.chernivtsi_poweroff.const import STATE_OFF, STATE_ON, STATE_POSSIBLE_ON
+from custom_components.chernivtsi_poweroff.energyua_scrapper import EnergyUaScrapper
+from custom_components.chernivtsi_poweroff.entities import PowerOffPeriod
+from custom_components.chernivtsi_poweroff.schedule import DaySchedule, GroupSchedule, longest_run, mask_runs
+
+
+def test_mask_runs():
+    assert mask_runs(0) == []
+    assert mask_runs(0b1) == [(0, 1)]
+    assert mask_runs(0b0111_0110) == [(1, 3), (4, 7)]
+    assert mask_runs((1 << 48) - 1) == [(0, 48)]
+
+
+def test_longest_run():
+    assert longest_run(0) == 0
+    assert longest_run(0b0111_0110) == 3
+    assert longest_run((1 << 48) - 1) == 48
+
+
+def test_day_schedule_state_at():
+    day = DaySchedule.from_tokens(["З"] * 44 + ["МЗ", "В", "В", "В"])
+
+    assert day.state_at(0) == STATE_ON
+    assert day.state_at(44) == STATE_POSSIBLE_ON
+    assert day.state_at(47) == STATE_OFF
+    assert day.runs(STATE_OFF) == [(45, 48)]
+    assert day.runs(STATE_ON) == [(0, 44)]
+    assert (day.count(STATE_OFF), day.count(STATE_POSSIBLE_ON), day.count(STATE_ON)) == (3, 1, 44)
+    assert day.longest_run(STATE_ON) == 44
+    assert DaySchedule.from_tokens(day.to_tokens()) == day
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_group_schedule_periods_match_token_scan(seed):
+    rng = random.Random(seed)
+    tokens = [[rng.choice(["В", "З", "МЗ"]) for _ in range(48)] for _ in range(2)]
+    scr = EnergyUaScrapper()
+
+    expected = []
+    for day_idx, day_tokens in enumerate(tokens):
+        for target, state in (("В", STATE_OFF), ("МЗ", STATE_POSSIBLE_ON)):
+            expected += [
+                PowerOffPeriod(s, e, today=(day_idx == 0), state=state)
+                for s, e in scr._tokens_to_periods(day_tokens, target=target)  # type: ignore[attr-defined]
+            ]
+
+    schedule = GroupSchedule.from_tokens(tokens)
+    assert schedule.periods == expected
+    assert schedule.periods is schedule.periods
+    assert schedule == GroupSchedule.from_tokens(tokens)
+    assert schedule.state_at(2, 0) == STATE_ON
+
+
+def test_changed_slots():
+    today = ["З"] * 10 + ["В"] * 4 + ["З"] * 34
+    tomorrow = ["МЗ"] * 2 + ["З"] * 46
+    schedule = GroupSchedule.from_tokens([today, tomorrow])
+
+    assert schedule.changed_slots(GroupSchedule.from_tokens([today, tomorrow])) == []
+    assert GroupSchedule.from_tokens([today]).changed_slots(schedule) == [(1, 0), (1, 1)]
+    edited = today[:12] + ["МЗ"] + today[13:]
+    assert GroupSchedule.from_tokens([edited, tomorrow]).changed_slots(schedule) == [(0, 12)]
+    # A day later yesterday's tomorrow is compared with today
+    assert GroupSchedule.from_tokens([tomorrow]).changed_slots(schedule, shift=1) == []
@@ -0,0 +1,45 @@
+from datetime import UTC, date, datetime
+
+import pytest
+
+from custom_components.chernivtsi_poweroff.schedule import GroupSchedule
+from custom_components.chernivtsi_poweroff.snapshot import (
+    HEADER,
+    Snapshot,
+    SnapshotError,
+    decode_snapshot,
+    encode_snapshot,
+)
+from tests.fake_oblenergo import random_schedules
+
+SNAPSHOT = Snapshot(
+    {group: GroupSchedule.from_tokens(tokens) for group, tokens in random_schedules(groups=12, days=2).items()},
+    date(2026, 10, 17),
+    datetime(2026, 10, 17, 6, 30, tzinfo=UTC),
+    "0123456789abcdef0123456789abcdef",
+)
+
+
+def test_round_trip_is_compact():
+    data = encode_snapshot(SNAPSHOT)
+
+    assert len(data) == 346
+    assert decode_snapshot(data) == SNAPSHOT
+    # A schedule without a page hash (e.g. after a midnight shift) stays without one
+    assert decode_snapshot(encode_snapshot(SNAPSHOT._replace(content_hash=None))).content_hash is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"XXXX" + encode_snapshot(SNAPSHOT)[4:],
+        encode_snapshot(SNAPSHOT)[:4] + b"\x02" + encode_snapshot(SNAPSHOT)[5:],
+        encode_snapshot(SNAPSHOT)[:-1],
+        encode_snapshot(SNAPSHOT) + b"\x00",
+        encode_snapshot(SNAPSHOT)[: HEADER.size + 1],
+    ],
+)
+def test_malformed_snapshots_raise(data):
+    with pytest.raises(SnapshotError):
+        decode_snapshot(data)